@@ -1,5 +1,6 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_migrate import Migrate
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from .extensions import db, jwt, cors, migrate
 from app.routes.appointment_routes import appointment_bp
 from app.routes.main_routes import main_bp
@@ -9,15 +10,34 @@ from app.routes.patients_routes import patient_bp
 from app.routes.speciality_routes import speciality_bp
 # from app.routes.user_routes import user_bp
 from .routes.auth_routes import auth_bp
-from .config import Config
+from .config import get_config
+from .utils.pagination import InvalidCursor
+from .utils.compression import CompressionMiddleware
+from .utils.metrics import register_metrics
+from .utils.engine import is_statement_timeout, register_engine_hooks
+from .utils.replicas import register_replica_routing
+from .utils.query_stats import register_query_stats
+from .utils.profiling import register_profiling
+from .utils.fieldsets import InvalidFieldset
+from .utils.serialization import FastJSONProvider
+from .utils.passwords import PasswordServiceBusy
+from .utils.booked_slots import register_invalidation_hooks
+from .utils.search import register_search_hooks
+from .utils.directory_cache import register_directory_hooks
+from .utils.stat_counters import register_counter_hooks
+from .utils.rollups import register_rollup_hooks
+from .utils.tokens import register_token_checks
+from .utils.revocation import register_revocation_checks
+from .cli import register_commands
 # from app.routes.user_routes import user_bp
 # from app.routes.doctor_routes import doctor_bp
 # from app.routes.patient_routes import patient_bp
 
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(get_config(config_name))
 
     # Initialize extensions
     db.init_app(app)
@@ -43,6 +63,11 @@ def create_app():
     from app.models.doctoravailability import DoctorAvailability
     from app.models.admin import Admin
     from app.models.doctorsapplications import DoctorApplication
+    from app.models.cache_version import CacheVersion
+    from app.models.stat_counter import StatCounter
+    from app.models.appointment_rollup import AppointmentRollup
+    from app.models.payment_rollup import PaymentRollup
+    from app.models.revoked_token import RevokedToken
     
 
     # Register blueprints (will add later)
@@ -55,4 +80,46 @@ def create_app():
     app.register_blueprint(patient_bp)
     app.register_blueprint(speciality_bp)
 
+    register_invalidation_hooks()
+    register_search_hooks()
+    register_directory_hooks()
+    register_counter_hooks()
+    register_rollup_hooks()
+    register_token_checks(jwt)
+    register_revocation_checks(jwt)
+    register_commands(app)
+    register_profiling(app)
+    register_engine_hooks(app, db)
+    register_replica_routing(app, db.session)
+
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config["COMPRESS_MIN_SIZE"],
+        level=app.config["COMPRESS_LEVEL"],
+    )
+    register_query_stats(app)
+    register_metrics(app)
+
+    @app.errorhandler(InvalidCursor)
+    def handle_invalid_cursor(error):
+        return jsonify({"error": str(error)}), 400
+
+    @app.errorhandler(InvalidFieldset)
+    def handle_invalid_fieldset(error):
+        return jsonify({"error": str(error)}), 400
+
+    @app.errorhandler(PasswordServiceBusy)
+    def handle_password_service_busy(error):
+        return jsonify({"error": str(error)}), 503, {"Retry-After": "1"}
+
+    @app.errorhandler(PoolTimeoutError)
+    def handle_pool_timeout(error):
+        return jsonify({"error": "The server is busy, please retry"}), 503, {"Retry-After": "1"}
+
+    @app.errorhandler(OperationalError)
+    def handle_statement_timeout(error):
+        if not is_statement_timeout(error):
+            raise error
+        return jsonify({"error": "The request took too long to complete"}), 503
+
     return app
@@ -0,0 +1,52 @@
+import click
+from flask.cli import AppGroup
+
+stats_cli = AppGroup("stats", help="Admin statistics counters.")
+
+
+@stats_cli.command("reconcile")
+def reconcile_command():
+    """Recompute stat_counters from the source tables."""
+    from app.utils.stat_counters import reconcile_counters
+
+    drift = reconcile_counters()
+    if not drift:
+        click.echo("All counters were accurate.")
+        return
+    for name, (stored, actual) in sorted(drift.items()):
+        click.echo(f"{name}: {stored} -> {actual}")
+    click.echo(f"Corrected {len(drift)} counter(s).")
+
+
+rollups_cli = AppGroup("rollups", help="Appointment and payment rollup tables.")
+
+
+@rollups_cli.command("backfill")
+@click.option("--batch-size", default=5000, show_default=True, help="Source rows per transaction.")
+def backfill_command(batch_size):
+    """Rebuild the rollup tables from appointments and payments."""
+    from app.utils.rollups import backfill_rollups
+
+    def progress(table, done, total):
+        click.echo(f"{table}: {done}/{total}")
+
+    totals = backfill_rollups(batch_size=batch_size, progress=progress)
+    for table, rows in totals.items():
+        click.echo(f"Rolled up {rows} {table} row(s).")
+
+
+tokens_cli = AppGroup("tokens", help="Access token revocation.")
+
+
+@tokens_cli.command("prune")
+def prune_command():
+    """Delete revoked_tokens rows whose tokens have expired."""
+    from app.utils.revocation import prune_revoked_tokens
+
+    click.echo(f"Pruned {prune_revoked_tokens()} expired revocation(s).")
+
+
+def register_commands(app):
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(tokens_cli)
@@ -0,0 +1,21 @@
+from app.extensions import db
+
+class AppointmentRollup(db.Model):
+    __tablename__ = "appointment_rollups"
+
+    # month of appointment_time as "YYYY-MM"; no foreign key so history
+    # survives a doctor being removed
+    month = db.Column(db.String(7), primary_key=True)
+    doctor_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        """Return the rollup key and appointment count."""
+        return {
+            "month": self.month,
+            "doctor_id": self.doctor_id,
+            "status": self.status,
+            "count": self.count
+        }
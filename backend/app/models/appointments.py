@@ -1,8 +1,30 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 from datetime import datetime
 
+# statuses that no longer hold the doctor's time slot
+RELEASED_STATUSES = ("Cancelled", "cancelled", "Rejected", "rejected")
+ACTIVE_SLOT_CONDITION = "status NOT IN ({})".format(", ".join(f"'{s}'" for s in RELEASED_STATUSES))
+
 class Appointment(db.Model):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # one active appointment per doctor and slot, enforced by the database
+        db.Index(
+            "uq_appointments_doctor_active_slot",
+            "doctor_id",
+            "appointment_time",
+            unique=True,
+            postgresql_where=db.text(ACTIVE_SLOT_CONDITION),
+            sqlite_where=db.text(ACTIVE_SLOT_CONDITION),
+        ),
+        # doctor schedule and booked-slot range scans
+        db.Index("ix_appointments_doctor_id_appointment_time", "doctor_id", "appointment_time"),
+        # patient's own bookings
+        db.Index("ix_appointments_patient_id_appointment_time", "patient_id", "appointment_time"),
+        # admin listing, keyset-paginated on (appointment_time, id)
+        db.Index("ix_appointments_appointment_time_id", "appointment_time", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -30,21 +52,18 @@ class Appointment(db.Model):
 
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "patient_id": self.patient_id,
-            "patient": {
-                "id": self.patient.id,
-                "name": self.patient.name,
-                "email": self.patient.email,
-            },
-            "doctor_id": self.doctor_id,
-            "doctor_user_id": self.doctor.user_id if self.doctor else None,
-            "reason": self.reason,
-            "appointment_time": self.appointment_time,
-            "status": self.status,
-            "doctor": self.doctor.to_dict() if self.doctor else None,
-            "consultation_type": self.consultation_type,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at,
+        data = _serialize_columns(self)
+        data["patient"] = {
+            "id": self.patient.id,
+            "name": self.patient.name,
+            "email": self.patient.email,
         }
+        data["doctor_user_id"] = self.doctor.user_id if self.doctor else None
+        data["doctor"] = self.doctor.to_dict() if self.doctor else None
+        return data
+
+
+_serialize_columns = ColumnSerializer(Appointment, (
+    "id", "patient_id", "doctor_id", "reason", "appointment_time", "status",
+    "consultation_type", "created_at", "updated_at",
+))
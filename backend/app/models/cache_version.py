@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class CacheVersion(db.Model):
+    __tablename__ = "cache_versions"
+
+    # one row per cached namespace, e.g. "doctors" or "specialities"
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Return the namespace and its current version."""
+        return {
+            "name": self.name,
+            "version": self.version
+        }
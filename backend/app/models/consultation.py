@@ -1,14 +1,19 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 from datetime import datetime
 
 class Consultation(db.Model):
     __tablename__ = "consultations"
+    __table_args__ = (
+        # admin listing, keyset-paginated on (start_time, id)
+        db.Index("ix_consultations_start_time_id", "start_time", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey("appointments.id"), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey("appointments.id"), nullable=False, index=True)
 
-    doctor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    patient_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
 
     symptoms = db.Column(db.Text, nullable=True)
     examination = db.Column(db.Text, nullable=True)
@@ -27,16 +32,10 @@ class Consultation(db.Model):
     patient = db.relationship("User", foreign_keys=[patient_id])
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "appointment_id": self.appointment_id,
-            "doctor_id": self.doctor_id,
-            "patient_id": self.patient_id,
-            "symptoms": self.symptoms,
-            "examination": self.examination,
-            "diagnosis": self.diagnosis,
-            "prescription": self.prescription,
-            "notes": self.notes,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
+        return _serialize_columns(self)
+
+
+_serialize_columns = ColumnSerializer(Consultation, (
+    "id", "appointment_id", "doctor_id", "patient_id", "symptoms", "examination", "diagnosis",
+    "prescription", "notes", "created_at", "updated_at",
+))
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class DoctorAvailability(db.Model):
     __tablename__ = "doctor_availability"
+    __table_args__ = (
+        db.Index("ix_doctor_availability_doctor_id_day_of_week", "doctor_id", "day_of_week"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     doctor_id = db.Column(db.Integer, db.ForeignKey("doctors.id"), nullable=False)
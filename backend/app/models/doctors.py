@@ -1,13 +1,14 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class Doctor(db.Model):
     __tablename__ = "doctors"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     
-    speciality_id = db.Column(db.Integer, db.ForeignKey("specialities.id"), nullable=False)
+    speciality_id = db.Column(db.Integer, db.ForeignKey("specialities.id"), nullable=False, index=True)
     bio = db.Column(db.Text, nullable=True)
     currency = db.Column(db.String(10), nullable=True)
     consultation_fee = db.Column(db.Float, nullable=True)
@@ -26,26 +27,21 @@ class Doctor(db.Model):
     appointments = db.relationship("Appointment", back_populates="doctor") # One-to-many relationship
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "status": self.status,
-            "experience_years": self.experience_years,
-            "currency": self.currency,
-            "consultation_fee": self.consultation_fee,
-            "profile_picture": self.profile_picture,
-            "location": self.location or "location not set",
-            "phone": self.phone,
-            "joined_at": self.joined_at,
-            "bio": self.bio,
-            "medicalLicenceNumber": self.medicalLicenceNumber,
-            "user": {
-                "id": self.user.id,
-                "name": self.user.name,
-                "email": self.user.email,
-            },
-
-            "speciality": {
-                "id": self.speciality.id,
-                "name": self.speciality.name,
-            }
+        data = _serialize_columns(self)
+        data["location"] = self.location or "location not set"
+        data["user"] = {
+            "id": self.user.id,
+            "name": self.user.name,
+            "email": self.user.email,
+        }
+        data["speciality"] = {
+            "id": self.speciality.id,
+            "name": self.speciality.name,
         }
+        return data
+
+
+_serialize_columns = ColumnSerializer(Doctor, (
+    "id", "status", "experience_years", "currency", "consultation_fee", "profile_picture",
+    "phone", "joined_at", "bio", "medicalLicenceNumber",
+))
@@ -1,8 +1,13 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 from datetime import datetime
 
 class DoctorApplication(db.Model):
     __tablename__ = "doctor_applications"
+    __table_args__ = (
+        # pending queue, keyset-paginated on id
+        db.Index("ix_doctor_applications_status_id", "status", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(120), nullable=False)
@@ -25,19 +30,12 @@ class DoctorApplication(db.Model):
     speciality = db.relationship("Speciality", back_populates="doctor_applications") # Many-to-one relationship
     def to_dict(self):
         """Return basic data about the doctor application."""
-        return {
-            "id": self.id,
-            "full_name": self.full_name,
-            "email": self.email,
-            "phone": self.phone,
-            "gender": self.gender,
-            "speciality_id": self.speciality_id,
-            "speciality": self.speciality.to_dict() if self.speciality else None,
-            "years_of_experience": self.years_of_experience,
-            "medicalLicenceNumber": self.medicalLicenceNumber,
-            "bio": self.bio,
-            "status": self.status,
-            "created_at": self.created_at,
-            "documents": self.documents
-        }
-    
+        data = _serialize_columns(self)
+        data["speciality"] = self.speciality.to_dict() if self.speciality else None
+        return data
+
+
+_serialize_columns = ColumnSerializer(DoctorApplication, (
+    "id", "full_name", "email", "phone", "gender", "speciality_id", "years_of_experience",
+    "medicalLicenceNumber", "bio", "status", "created_at", "documents",
+))
@@ -1,10 +1,11 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 
 class Patients(db.Model):
     __tablename__ = "patients"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     date_of_birth = db.Column(db.Date, nullable=True)
     emergency_contact = db.Column(db.String(100), nullable=True)
     age = db.Column(db.Integer, nullable=True)
@@ -18,14 +19,12 @@ class Patients(db.Model):
 
     def to_dict(self):
         """Return basic data about the patient."""
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "name": self.user.name,
-            "email": self.user.email,
-            "age": self.age,
-            "gender": self.gender,
-            "phone": self.phone,
-            "status": self.status,
-            "joined_at": self.joined_at,
-        }
\ No newline at end of file
+        data = _serialize_columns(self)
+        data["name"] = self.user.name
+        data["email"] = self.user.email
+        return data
+
+
+_serialize_columns = ColumnSerializer(Patients, (
+    "id", "user_id", "age", "gender", "phone", "status", "joined_at",
+))
@@ -0,0 +1,22 @@
+from app.extensions import db
+
+class PaymentRollup(db.Model):
+    __tablename__ = "payment_rollups"
+
+    # month of created_at as "YYYY-MM"
+    month = db.Column(db.String(7), primary_key=True)
+    doctor_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+    amount_cents = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        """Return the rollup key, payment count and amount."""
+        return {
+            "month": self.month,
+            "doctor_id": self.doctor_id,
+            "status": self.status,
+            "count": self.count,
+            "amount": self.amount_cents / 100
+        }
@@ -1,13 +1,14 @@
 from app.extensions import db
+from app.utils.serialization import ColumnSerializer
 from datetime import datetime
 
 class Payment(db.Model):
     __tablename__ = "payments"
 
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey("appointments.id"), nullable=False)
-    doctor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    patient_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey("appointments.id"), nullable=False, index=True)
+    doctor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
 
     amount = db.Column(db.Float, nullable=False)
     payment_method = db.Column(db.String(50), nullable=False)  # e.g. credit_card, paypal
@@ -23,15 +24,10 @@ class Payment(db.Model):
 
     def to_dict(self):
         """Return basic data about the payment."""
-        return {
-            "id": self.id,
-            "appointment_id": self.appointment_id,
-            "amount": self.amount,
-            "payment_method": self.payment_method,
-            "status": self.status,
-            "doctor_id": self.doctor_id,
-            "patient_id": self.patient_id,
-            "transaction_id": self.transaction_id,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
\ No newline at end of file
+        return _serialize_columns(self)
+
+
+_serialize_columns = ColumnSerializer(Payment, (
+    "id", "appointment_id", "amount", "payment_method", "status", "doctor_id", "patient_id",
+    "transaction_id", "created_at", "updated_at",
+))
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app.extensions import db
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    # users.id of the owner, informational only; no foreign key so deleting a user is not blocked
+    user_id = db.Column(db.Integer, nullable=True)
+    # the token's own exp; the row is useless (and pruned) after that
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        """Return the revoked token's jti, owner and timestamps."""
+        return {
+            "id": self.id,
+            "jti": self.jti,
+            "user_id": self.user_id,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "revoked_at": self.revoked_at.isoformat() if self.revoked_at else None
+        }
@@ -0,0 +1,18 @@
+from app.extensions import db
+
+class StatCounter(db.Model):
+    __tablename__ = "stat_counters"
+
+    # e.g. "users", "users:role:doctor", "appointments:month:2026-10"
+    name = db.Column(db.String(64), primary_key=True)
+    # a counter is the sum of its shards; see app/utils/stat_counters.py
+    shard = db.Column(db.SmallInteger, primary_key=True, default=0, server_default="0")
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        """Return the counter name, shard and value."""
+        return {
+            "name": self.name,
+            "shard": self.shard,
+            "value": self.value
+        }
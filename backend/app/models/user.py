@@ -8,7 +8,9 @@ class User(db.Model):
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default="patient")  # patient, doctor, admin
+    role = db.Column(db.String(20), nullable=False, default="patient", index=True)  # patient, doctor, admin
+    # bumped when the claims in a user's tokens go stale; see app/utils/tokens.py
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     
     patient_profile = db.relationship("Patients", back_populates="user", uselist=False) # One-to-one relationship
     doctor_profile = db.relationship("Doctor", back_populates="user", uselist=False) # One-to-one relationship
@@ -21,6 +23,5 @@ class User(db.Model):
             "id": self.id,
             "name": self.name,
             "email": self.email,
-            "role": self.role,
-            "gender": self.gender
+            "role": self.role
         }
@@ -1,4 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, Response, send_file, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.appointments import Appointment
 from app.models.doctoravailability import DoctorAvailability
@@ -7,9 +9,22 @@ from app.models.doctorsapplications import DoctorApplication
 from app.models.consultation import Consultation
 from app.models.user import User
 from app.extensions import db
-from werkzeug.security import generate_password_hash
-from werkzeug.security import check_password_hash
+from app.utils.passwords import passwords
 from app.utils.permissions import role_required
+from app.utils.slot_index import slot_index
+from app.utils.query_options import (
+    APPLICATION_WITH_SPECIALITY,
+    PATIENT_WITH_USER,
+)
+from app.utils.pagination import keyset_paginate
+from app.utils.fieldsets import APPOINTMENT_FIELDS, CONSULTATION_FIELDS, DOCTOR_FIELDS
+from app.utils.booked_slots import booked_slots_cache
+from app.utils.directory_cache import directory_cache
+from app.utils.stat_counters import dashboard_figures, month_key, read_counter, read_counters
+from app.utils.rollups import trends
+from app.utils.export import EXPORT_FORMATS, ExportError, parse_date_range, stream_export
+from app.utils.engine import EXPORT_TIMEOUT, statement_timeout
+from app.utils.profiling import SORT_KEYS
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -17,9 +32,15 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 @jwt_required()
 @role_required('admin')
 def get_all_appointments():
-    appointments = Appointment.query.all()
-    result = [appointment.to_dict() for appointment in appointments]
-    return jsonify(result), 200
+    selection = APPOINTMENT_FIELDS.from_request()
+    page = keyset_paginate(
+        Appointment.query.options(*selection.options()),
+        Appointment.id,
+        selection.serialize,
+        sort_column=Appointment.appointment_time,
+        descending=True,
+    )
+    return jsonify(page), 200
 
 @admin_bp.route('/doctors/availability', methods=['POST'])
 @jwt_required()
@@ -47,17 +68,22 @@ def set_doctor_availability():
 @jwt_required()
 @role_required(['admin'])
 def get_all_consultations():
-    consultations = Consultation.query.all()
-    result = [consultation.to_dict() for consultation in consultations]
-    return jsonify(result), 200
+    selection = CONSULTATION_FIELDS.from_request()
+    page = keyset_paginate(
+        Consultation.query.options(*selection.options()),
+        Consultation.id,
+        selection.serialize,
+        sort_column=Consultation.start_time,
+        descending=True,
+    )
+    return jsonify(page), 200
 
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
 def get_all_users():
-    users = User.query.all()
-    result = [user.to_dict() for user in users]
-    return jsonify(result), 200
+    page = keyset_paginate(User.query, User.id, lambda user: user.to_dict())
+    return jsonify(page), 200
 
 
 # @admin_bp.route('/users/doctors', methods=['GET'])
@@ -75,8 +101,9 @@ def get_all_users():
 @jwt_required()
 @role_required(['admin'])
 def get_all_doctors():
-    doctors = Doctor.query.all()
-    result = [doctor.to_dict() for doctor in doctors]
+    selection = DOCTOR_FIELDS.from_request()
+    doctors = Doctor.query.options(*selection.options()).all()
+    result = [selection.serialize(doctor) for doctor in doctors]
     return jsonify(result), 200
 
 @admin_bp.route('/patients/all', methods=['GET'])
@@ -84,9 +111,12 @@ def get_all_doctors():
 @role_required(['admin'])
 def get_all_patients():
     from app.models.patients import Patients
-    patients = Patients.query.all()
-    result = [patient.to_dict() for patient in patients]
-    return jsonify(result), 200
+    page = keyset_paginate(
+        Patients.query.options(*PATIENT_WITH_USER),
+        Patients.id,
+        lambda patient: patient.to_dict(),
+    )
+    return jsonify(page), 200
 
 @admin_bp.route('/users/doctors/<int:user_id>', methods=['GET'])
 @jwt_required()
@@ -146,6 +176,7 @@ def delete_doctor_availability(availability_id):
 
     db.session.delete(availability)
     db.session.commit()
+    slot_index.invalidate(availability.doctor_id)
     return jsonify({"msg": "Doctor availability deleted successfully"}), 200
 
 
@@ -153,17 +184,102 @@ def delete_doctor_availability(availability_id):
 @jwt_required()
 @role_required(['admin'])
 def get_system_stats():
-    total_users = User.query.count()
-    total_appointments = Appointment.query.count()
-    total_consultations = Consultation.query.count()
+    counters = read_counters("users", "appointments", "consultations")
 
     stats = {
-        "total_users": total_users,
-        "total_appointments": total_appointments,
-        "total_consultations": total_consultations
+        "total_users": counters["users"],
+        "total_appointments": counters["appointments"],
+        "total_consultations": counters["consultations"]
     }
     return jsonify(stats), 200
 
+# ============================
+# dashboard: every overview figure in one request
+# ============================
+@admin_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_dashboard():
+    from datetime import datetime
+
+    return jsonify(dashboard_figures(datetime.now())), 200
+
+# ============================
+# analytics: monthly trends from the rollup tables
+# ============================
+@admin_bp.route('/analytics/trends', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_analytics_trends():
+    from datetime import datetime
+
+    # default: the last 12 months including the current one
+    now = datetime.now()
+    year, month = (now.year, now.month - 11) if now.month == 12 else (now.year - 1, now.month + 1)
+    first = request.args.get('from', f"{year:04d}-{month:02d}")
+    last = request.args.get('to', month_key(now))
+    try:
+        first_month = datetime.strptime(first, "%Y-%m")
+        last_month = datetime.strptime(last, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYY-MM"}), 400
+    first, last = month_key(first_month), month_key(last_month)
+    span = (last_month.year - first_month.year) * 12 + last_month.month - first_month.month
+    if span < 0:
+        return jsonify({"error": "'to' must not be before 'from'"}), 400
+    if span >= 120:
+        return jsonify({"error": "At most 120 months per request"}), 400
+
+    doctor_id = request.args.get('doctor_id', type=int)
+    speciality_id = request.args.get('speciality_id', type=int)
+
+    return jsonify(trends(first, last, doctor_id=doctor_id, speciality_id=speciality_id)), 200
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_cache_stats():
+    return jsonify([booked_slots_cache.stats(), directory_cache.stats()]), 200
+
+# ==========================
+# Request profiles (see app/utils/profiling.py)
+# ==========================
+
+@admin_bp.route('/profiles', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def list_profiles():
+    return jsonify(current_app.extensions["profile_store"].list()), 200
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def download_profile(profile_id):
+    store = current_app.extensions["profile_store"]
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({"error": "sort must be one of: " + ", ".join(SORT_KEYS)}), 400
+        text = store.text(profile_id, limit=request.args.get('limit', 50, type=int), sort=sort)
+        if text is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return Response(text, mimetype="text/plain")
+    path = store.path(profile_id, "prof")
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+@admin_bp.route('/profiles/<profile_id>/memory', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def download_profile_memory(profile_id):
+    path = current_app.extensions["profile_store"].path(profile_id, "tracemalloc")
+    if path is None:
+        return jsonify({"error": "Memory snapshot not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                     download_name=f"{profile_id}.tracemalloc")
+
 #approve or reject doctor applications
 @admin_bp.route('/doctors/applications/approve/<int:application_id>', methods=['POST'])
 @jwt_required()
@@ -177,7 +293,7 @@ def review_doctor_application(application_id):
     
     # Generate temp password
     temp_password = "doc12345"  # In real scenario, generate a secure random password and email it to the doctor. Also you can use random generation libraries.
-    hashed_password = generate_password_hash(temp_password)
+    hashed_password = passwords.hash(temp_password)
     # Create user account (doctor will later set password via email link)
     new_user = User(
         name=application.full_name,
@@ -233,22 +349,25 @@ def reject_doctor_application(application_id):
 @jwt_required()
 @role_required(["admin"])
 def get_doctor_applications():
-    applications = DoctorApplication.query.filter_by(status='pending').all()
-    result = [app.to_dict() for app in applications]
-    return jsonify(result), 200
+    page = keyset_paginate(
+        DoctorApplication.query.options(*APPLICATION_WITH_SPECIALITY).filter_by(status='pending'),
+        DoctorApplication.id,
+        lambda application: application.to_dict(),
+    )
+    return jsonify(page), 200
 
 @admin_bp.route('/patients/total', methods=['GET'])
 @jwt_required()
 @role_required(["admin"])
 def get_total_patients():
-    total_patients = User.query.filter_by(role='patient').count()
+    total_patients = read_counter('users:role:patient')
     return jsonify({'total_patients': total_patients}), 200
 
 @admin_bp.route('/doctors/total', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
 def get_total_doctors():
-    total_doctors = User.query.filter_by(role='doctor').count()
+    total_doctors = read_counter('users:role:doctor')
     return jsonify({'total_doctors': total_doctors}), 200
 
 # ============================
@@ -258,7 +377,7 @@ def get_total_doctors():
 @jwt_required()
 @role_required(['admin'])
 def get_pending_doctor_applications_count():
-    pending_count = DoctorApplication.query.filter_by(status='pending').count()
+    pending_count = read_counter('doctor_applications:status:pending')
     return jsonify({'pending_applications': pending_count}), 200
 
 # ============================
@@ -269,15 +388,105 @@ def get_pending_doctor_applications_count():
 @role_required(['admin'])
 def get_appointments_this_month_count():
     from datetime import datetime
-    from sqlalchemy import extract
 
-    now = datetime.now()
-    month = now.month
-    year = now.year
-
-    count = Appointment.query.filter(
-        extract('month', Appointment.date) == month,
-        extract('year', Appointment.date) == year
-    ).count()
+    count = read_counter(f"appointments:month:{month_key(datetime.now())}")
 
     return jsonify({'appointments_this_month': count}), 200
+
+
+# ============================
+# streaming exports for reports
+# ============================
+def _export_response(statement, name):
+    fmt = request.args.get("format", "ndjson")
+    return Response(
+        stream_with_context(stream_export(statement, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"},
+    )
+
+
+def _export_filters(time_column, status_column):
+    if request.args.get("format", "ndjson") not in EXPORT_FORMATS:
+        raise ExportError("format must be one of: " + ", ".join(EXPORT_FORMATS))
+
+    start, end = parse_date_range(request.args.get("from"), request.args.get("to"))
+    filters = []
+    if start:
+        filters.append(time_column >= start)
+    if end:
+        filters.append(time_column < end)
+
+    statuses = [s for s in request.args.get("status", "").split(",") if s]
+    if statuses:
+        filters.append(status_column.in_(statuses))
+    return filters
+
+
+@admin_bp.route('/export/appointments', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+@statement_timeout(EXPORT_TIMEOUT)
+def export_appointments():
+    try:
+        filters = _export_filters(Appointment.appointment_time, Appointment.status)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+
+    patient = aliased(User)
+    doctor_user = aliased(User)
+    statement = (
+        select(
+            Appointment.id,
+            Appointment.appointment_time,
+            Appointment.status,
+            Appointment.consultation_type,
+            Appointment.reason,
+            Appointment.patient_id,
+            patient.name.label("patient_name"),
+            patient.email.label("patient_email"),
+            Appointment.doctor_id,
+            doctor_user.name.label("doctor_name"),
+            Appointment.created_at,
+            Appointment.updated_at,
+        )
+        .join(patient, Appointment.patient_id == patient.id)
+        .join(Doctor, Appointment.doctor_id == Doctor.id)
+        .join(doctor_user, Doctor.user_id == doctor_user.id)
+        .where(*filters)
+        .order_by(Appointment.appointment_time, Appointment.id)
+    )
+    return _export_response(statement, "appointments")
+
+
+@admin_bp.route('/export/consultations', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+@statement_timeout(EXPORT_TIMEOUT)
+def export_consultations():
+    try:
+        filters = _export_filters(Consultation.start_time, Consultation.status)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = (
+        select(
+            Consultation.id,
+            Consultation.appointment_id,
+            Consultation.doctor_id,
+            Consultation.patient_id,
+            Consultation.status,
+            Consultation.start_time,
+            Consultation.end_time,
+            Consultation.symptoms,
+            Consultation.examination,
+            Consultation.diagnosis,
+            Consultation.prescription,
+            Consultation.notes,
+            Consultation.created_at,
+            Consultation.updated_at,
+        )
+        .where(*filters)
+        .order_by(Consultation.start_time, Consultation.id)
+    )
+    return _export_response(statement, "consultations")
@@ -7,7 +7,11 @@ from app.models.doctoravailability import DoctorAvailability
 from app.models.consultation import Consultation
 from app.models.user import User
 from app.extensions import db
-from app.utils.permissions import role_required
+from app.utils.permissions import current_doctor_id, current_user_id, role_required
+from app.utils.slot_index import slot_index
+from app.utils.booking import book_slot, SlotAlreadyBooked
+from app.utils.pagination import keyset_paginate
+from app.utils.fieldsets import APPOINTMENT_FIELDS
 
 appointment_bp = Blueprint("appointment_bp", __name__, url_prefix="/api/appointments")
 
@@ -33,6 +37,7 @@ def book_appointment():
     doctor = Doctor.query.filter_by(id=doctor_id, status="active").first()
     if not doctor:
         return jsonify({"error": "Doctor not found"}), 404
+    doctor_id = doctor.id
 
 
     # Combine date + slot → datetime
@@ -44,26 +49,17 @@ def book_appointment():
     except ValueError:
         return jsonify({"error": "Invalid date or time format"}), 400
     
-    # Check if slot already booked
-
-    existing = Appointment.query.filter_by(
-        doctor_id=doctor_id,
-        appointment_time=appointment_time
-    ).first()
-    
-    if existing:
+    # The unique index on active (doctor_id, appointment_time) decides races
+    try:
+        new_appointment = book_slot(
+            patient_id=patient_id,
+            doctor_id=doctor_id,
+            appointment_time=appointment_time,
+            reason=reason,
+            status="Pending"   # recommended status
+        )
+    except SlotAlreadyBooked:
         return jsonify({"error": "Time slot already booked"}), 409
-    
-    # Create appointment
-    new_appointment = Appointment(
-        patient_id=patient_id,
-        doctor_id=doctor_id,
-        reason=reason,
-        appointment_time=appointment_time,
-        status="Pending"   # recommended status
-    )
-    db.session.add(new_appointment)
-    db.session.commit()
 
     return jsonify({"message": "Appointment booked successfully", "appointment": new_appointment.to_dict()}), 201
 
@@ -78,9 +74,10 @@ def book_appointment():
 @role_required(["patient"])
 def patient_appointments():
     patient_id = get_jwt_identity()
-    appointments = Appointment.query.filter_by(patient_id=patient_id).all()
+    selection = APPOINTMENT_FIELDS.from_request()
+    appointments = Appointment.query.options(*selection.options()).filter_by(patient_id=patient_id).all()
 
-    return jsonify([a.to_dict() for a in appointments]), 200
+    return jsonify([selection.serialize(a) for a in appointments]), 200
 
 
 # ============================
@@ -92,7 +89,6 @@ def patient_appointments():
 @role_required("patient")
 def cancel_appointment(appointment_id):
     patient_id = int(get_jwt_identity())
-    print("Patient ID:", patient_id)
 
     appointment = Appointment.query.get_or_404(appointment_id)
     if not appointment:
@@ -117,39 +113,16 @@ def view_available_slots(doctor_id):
     date_str = request.args.get("date")
     if not date_str:
         return jsonify({"msg": "date query parameter is required"}), 400
-    appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    weekday = appointment_date.strftime("%A")
-    
-    slots = DoctorAvailability.query.filter_by(doctor_id=doctor_id, day_of_week=weekday).all()
-    
-    if not slots:
+    try:
+        appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    # weekly availability and booked slots come from the slot index as bitmaps
+    available_slots = slot_index.free_slots(doctor_id, appointment_date)
+    if available_slots is None:
         return jsonify({"msg": "No availability found for the given date"}), 404
-    
-    # Get all existing appointments for that date
-    existing_appointments = Appointment.query.filter_by(doctor_id=doctor_id, appointment_date=appointment_date).all()
-    
-    booked_times = [
-        a.time.strftime("%H:%M") for a in existing_appointments
-    ]
-    
-    # Build available slots
-    available_slots = []
-    for slot in slots:
-        # assuming slots are in 30-minute intervals
-        start_time = datetime.combine(appointment_date, slot.start_time)
-        end_time = datetime.combine(appointment_date, slot.end_time)
-        
-        while start_time <= end_time:
-            time_str = start_time.strftime("%H:%M")
-            if time_str not in booked_times:
-                available_slots.append({
-                    "day_of_week": slot.day_of_week,
-                    "start_time": slot.start_time.strftime("%H:%M"),
-                    "end_time": slot.end_time.strftime("%H:%M"),
-                    "available_time": time_str
-                })
-            start_time += timedelta(minutes=30)
-    
+
     return jsonify({
         "date": date_str,
         "available_slots": available_slots
@@ -163,10 +136,10 @@ def view_available_slots(doctor_id):
 @jwt_required()
 @role_required(["doctor"])
 def doctor_appointments():
-    doctor_id = get_jwt_identity()
-    appointments = Appointment.query.filter_by(doctor_id=doctor_id).all()
+    selection = APPOINTMENT_FIELDS.from_request()
+    appointments = Appointment.query.options(*selection.options()).filter_by(doctor_id=current_doctor_id()).all()
 
-    return jsonify([a.to_dict() for a in appointments]), 200
+    return jsonify([selection.serialize(a) for a in appointments]), 200
 
 
 
@@ -178,8 +151,15 @@ def doctor_appointments():
 @jwt_required()
 @role_required(["admin"])
 def all_appointments():
-    appointments = Appointment.query.all()
-    return jsonify([a.to_dict() for a in appointments]), 200
+    selection = APPOINTMENT_FIELDS.from_request()
+    page = keyset_paginate(
+        Appointment.query.options(*selection.options()),
+        Appointment.id,
+        selection.serialize,
+        sort_column=Appointment.appointment_time,
+        descending=True,
+    )
+    return jsonify(page), 200
 
 
 
@@ -208,11 +188,10 @@ def delete_appointment(appointment_id):
 @jwt_required()
 @role_required(["doctor"])
 def start_virtual(appointment_id):
-    doctor_id = get_jwt_identity()
     appointment = Appointment.query.get_or_404(appointment_id)
 
-    # Doctor ownership check
-    if appointment.doctor_id != doctor_id:
+    # Doctor ownership check: Appointment.doctor_id is a doctors.id
+    if appointment.doctor_id != current_doctor_id():
         return jsonify({"error": "Unauthorized"}), 403
 
     if appointment.status != "approved":
@@ -221,9 +200,10 @@ def start_virtual(appointment_id):
     appointment.status = "in_progress"
 
     # Create consultation record
+    # Consultation.doctor_id references users.id
     consultation = Consultation(
         appointment_id=appointment.id,
-        doctor_id=doctor_id,
+        doctor_id=current_user_id(),
         patient_id=appointment.patient_id
     )
     db.session.add(consultation)
@@ -243,10 +223,9 @@ def start_virtual(appointment_id):
 @jwt_required()
 @role_required(["doctor"])
 def start_physical(appointment_id):
-    doctor_id = get_jwt_identity()
     appointment = Appointment.query.get_or_404(appointment_id)
 
-    if appointment.doctor_id != doctor_id:
+    if appointment.doctor_id != current_doctor_id():
         return jsonify({"error": "Unauthorized"}), 403
 
     if appointment.status != "approved":
@@ -254,9 +233,10 @@ def start_physical(appointment_id):
 
     appointment.status = "in_progress"
 
+    # Consultation.doctor_id references users.id
     consultation = Consultation(
         appointment_id=appointment.id,
-        doctor_id=doctor_id,
+        doctor_id=current_user_id(),
         patient_id=appointment.patient_id
     )
     db.session.add(consultation)
@@ -276,10 +256,9 @@ def start_physical(appointment_id):
 @jwt_required()
 @role_required(["doctor"])
 def write_notes(consultation_id):
-    doctor_id = get_jwt_identity()
     consultation = Consultation.query.get_or_404(consultation_id)
 
-    if consultation.doctor_id != doctor_id:
+    if consultation.doctor_id != current_user_id():
         return jsonify({"error": "You are not assigned to this consultation"}), 403
 
     data = request.get_json() or {}
@@ -305,10 +284,9 @@ def write_notes(consultation_id):
 @jwt_required()
 @role_required(["doctor"])
 def end_consultation(appointment_id):
-    doctor_id = get_jwt_identity()
     appointment = Appointment.query.get_or_404(appointment_id)
 
-    if appointment.doctor_id != doctor_id:
+    if appointment.doctor_id != current_doctor_id():
         return jsonify({"error": "Unauthorized"}), 403
 
     if appointment.status != "in_progress":
@@ -328,16 +306,10 @@ def end_consultation(appointment_id):
 @jwt_required()
 @role_required(["doctor"])
 def approve_appointment(appointment_id):
-    doctor_id = int(get_jwt_identity())
-    doctor = User.query.get(doctor_id)
-
     appointment = Appointment.query.get_or_404(appointment_id)
-    print("Appointment ID:", appointment.id)
-    print("Appointment Doctor User ID:", appointment.doctor.user_id)
-    print("Doctor ID:", doctor.id)
-    # print("Appointment Doctor ID:", appointment.doctor_user_id)
+
     # Ensure doctor is approving THEIR OWN appointment
-    if appointment.doctor.user_id != doctor.id:
+    if appointment.doctor_id != current_doctor_id():
         return jsonify({"error": "You can only approve your own appointments"}), 403
 
     if appointment.status not in ["Pending"]:
@@ -354,13 +326,10 @@ def approve_appointment(appointment_id):
 @jwt_required()
 @role_required(["doctor"])
 def reject_appointment(appointment_id):
-    doctor_id = get_jwt_identity()
-    doctor = User.query.get(doctor_id)
-
     appointment = Appointment.query.get_or_404(appointment_id)
 
     # Ensure doctor is rejecting THEIR OWN appointment
-    if appointment.doctor_id != doctor.id:
+    if appointment.doctor_id != current_doctor_id():
         return jsonify({"error": "You can only reject your own appointments"}), 403
 
     if appointment.status not in ["pending"]:
@@ -3,9 +3,9 @@ from app.models.user import User
 from app.utils.permissions import role_required
 from flask_jwt_extended import jwt_required
 from app.extensions import db
-from werkzeug.security import generate_password_hash
-from werkzeug.security import check_password_hash
+from app.utils.passwords import passwords
 from flask_jwt_extended import create_access_token
+from app.utils.tokens import issue_access_token
 
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth' )
@@ -30,7 +30,7 @@ def register():
         return jsonify({'error': 'Email already registered'}), 400
 
     # Hash the password
-    hashed = generate_password_hash(password)
+    hashed = passwords.hash(password)
 
     # Create the user
     user = User(name=name, email=email, password=hashed, role=role)
@@ -74,7 +74,7 @@ def register_doctor(doctor_id):
         return jsonify({'error': 'Email already registered'}), 400
 
     # Hash the password
-    hashed = generate_password_hash(password)
+    hashed = passwords.hash(password)
 
     # Create the doctor user
     user = User(
@@ -112,10 +112,12 @@ def login_doctor():
     if not user:
         return jsonify({"error": "Invalid email or password"}), 401
 
-    if not check_password_hash(user.password, password):
+    if not passwords.verify_and_update(user, password):
         return jsonify({"error": "Invalid email or password"}), 401
+    if db.session.is_modified(user):
+        db.session.commit()  # password rehashed with the current parameters
 
-    access_token = create_access_token(identity=str(user.id), additional_claims={"role": "doctor"})
+    access_token = issue_access_token(user, "doctor")
 
     return jsonify({
         "message": "Login successful",
@@ -133,10 +135,12 @@ def login_patient():
     if not user:
         return jsonify({"error": "Invalid email or password"}), 401
 
-    if not check_password_hash(user.password, password):
+    if not passwords.verify_and_update(user, password):
         return jsonify({"error": "Invalid email or password"}), 401
+    if db.session.is_modified(user):
+        db.session.commit()  # password rehashed with the current parameters
 
-    access_token = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
+    access_token = issue_access_token(user)
     return jsonify({
         "message": "Login successful",
         "access_token": access_token
@@ -161,7 +165,7 @@ def register_admin():
         return jsonify({'error': 'Email already registered'}), 400
 
     # Hash the password
-    hashed = generate_password_hash(password)
+    hashed = passwords.hash(password)
 
     # Create the admin user
     user = User(name=name, email=email, password=hashed, role='admin')
@@ -184,10 +188,12 @@ def login_admin():
     if not user:
         return jsonify({"error": "Invalid email or password"}), 401
 
-    if not check_password_hash(user.password, password):
+    if not passwords.verify_and_update(user, password):
         return jsonify({"error": "Invalid email or password"}), 401
+    if db.session.is_modified(user):
+        db.session.commit()  # password rehashed with the current parameters
 
-    access_token = create_access_token(identity=str(user.id), additional_claims={"role": "admin"})
+    access_token = issue_access_token(user, "admin")
 
 
     return jsonify({
@@ -198,8 +204,15 @@ def login_admin():
 
     
 @auth_bp.route('/logout', methods=['POST'])
+@jwt_required(optional=True)
 def logout():
-    # In a real application, you would handle token revocation here.
+    # revoke the presented token so it stops working before it expires
+    from flask_jwt_extended import get_jwt
+    from app.utils.revocation import revoke_token
+    claims = get_jwt()
+    if claims.get("jti"):
+        revoke_token(claims)
+        db.session.commit()
     return jsonify({"message": "Logout successful"}), 200
 
 #fetch current user info
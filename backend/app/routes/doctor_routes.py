@@ -3,7 +3,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.doctoravailability import DoctorAvailability
 from app.extensions import db
 from datetime import time
-from app.utils.permissions import role_required
+from app.utils.permissions import current_doctor_id, role_required
+from app.utils.slot_index import slot_index
+from app.utils.query_options import DOCTOR_PROFILE
+from app.utils.pagination import keyset_paginate
+from app.utils.fieldsets import DOCTOR_FIELDS
+from app.utils.booked_slots import get_booked_slots as get_booked_slots_for_day
+from app.utils.search import doctor_search_index
+from app.utils.directory_cache import DOCTORS, cached_json_response
+from app.utils.engine import PUBLIC_READ_TIMEOUT, statement_timeout
 
 doctor_bp = Blueprint("doctor_bp", __name__, url_prefix="/api/doctors")
 
@@ -12,12 +20,9 @@ doctor_bp = Blueprint("doctor_bp", __name__, url_prefix="/api/doctors")
 @role_required(["doctor"])
 def add_availability():
     from datetime import datetime
-    doctor_user_id = get_jwt_identity()["id"]
-    from app.models.doctors import Doctor
-    doctor = Doctor.query.filter_by(user_id=doctor_user_id).first()
-    if not doctor:
+    doctor_id = current_doctor_id()
+    if not doctor_id:
         return jsonify({"error": "Doctor profile not found"}), 404
-    doctor_id = doctor.id
     data = request.get_json()
 
     day = data.get("day_of_week")
@@ -41,6 +46,7 @@ def add_availability():
     )
     db.session.add(availability)
     db.session.commit()
+    slot_index.invalidate(doctor_id)
 
     return jsonify({"msg": "Availability added"}), 201
 
@@ -48,11 +54,9 @@ def add_availability():
 @jwt_required()
 @role_required(["doctor"])
 def get_doctor_profile():
-    doctor_user_id = get_jwt_identity()
-    from app.models.doctor import Doctor
-    from app.models.speciality import Speciality
+    from app.models.doctors import Doctor
 
-    doctor = Doctor.query.filter_by(user_id=doctor_user_id).first()
+    doctor = Doctor.query.options(*DOCTOR_PROFILE).filter_by(id=current_doctor_id()).first()
     if not doctor:
         return jsonify({"msg": "Doctor profile not found"}), 404
 
@@ -62,11 +66,10 @@ def get_doctor_profile():
 @jwt_required()
 @role_required(["doctor"])
 def update_doctor_profile():
-    doctor_user_id = get_jwt_identity()
     data = request.get_json()
     from app.models.doctors import Doctor
     from app.models.specialities import Speciality
-    doctor = Doctor.query.filter_by(user_id=doctor_user_id).first()
+    doctor = Doctor.query.filter_by(id=current_doctor_id()).first()
     if not doctor:
         return jsonify({"msg": "Doctor profile not found"}), 404
 
@@ -159,7 +162,9 @@ def update_profile():
 @jwt_required()
 @role_required(["doctor"])
 def update_availability():
-    doctor_id = get_jwt_identity()
+    doctor_id = current_doctor_id()
+    if not doctor_id:
+        return jsonify({"error": "Doctor profile not found"}), 404
     data = request.get_json()
 
     availability_id = data.get("availability_id")
@@ -170,59 +175,81 @@ def update_availability():
     if not availability:
         return jsonify({"msg": "Availability slot not found"}), 404
 
-    if start_time:
-        availability.start_time = start_time
-    if end_time:
-        availability.end_time = end_time
+    from datetime import datetime
+    try:
+        if start_time:
+            availability.start_time = datetime.strptime(start_time, "%H:%M").time()
+        if end_time:
+            availability.end_time = datetime.strptime(end_time, "%H:%M").time()
+    except ValueError:
+        return jsonify({"error": "Invalid time format. Use HH:MM"}), 400
 
     db.session.commit()
+    slot_index.invalidate(doctor_id)
 
     return jsonify({"msg": "Availability updated"}), 200
 
 @doctor_bp.route("/search", methods=["GET"])
 @jwt_required()
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def search_doctors():
+    q = request.args.get("q")
     speciality = request.args.get("speciality")
-    gender = request.args.get("gender")
     location = request.args.get("location")
-    min_fee = request.args.get("min_fee")
-    max_fee = request.args.get("max_fee")
+    band = request.args.get("fee_band")
     date_str = request.args.get("available_date")
 
-    query = Doctor.query.join(User, Doctor.user_id == User.id)
-
-    # Filter by speciality
-    if speciality:
-        query = query.join(Speciality).filter(Speciality.name.ilike(f"%{speciality}%"))
-
-    # Filter by gender
-    if gender:
-        query = query.filter(User.gender == gender)
-
-    # Filter by location (if doctor has clinic / hospital assigned)
-    if location:
-        query = query.join(Clinic).filter(Clinic.location.ilike(f"%{location}%"))
-
-    # Filter by consultation fee
-    if min_fee:
-        query = query.filter(Doctor.consultation_fee >= float(min_fee))
-
-    if max_fee:
-        query = query.filter(Doctor.consultation_fee <= float(max_fee))
+    try:
+        min_fee = float(request.args["min_fee"]) if request.args.get("min_fee") else None
+        max_fee = float(request.args["max_fee"]) if request.args.get("max_fee") else None
+        page = max(int(request.args.get("page", 1)), 1)
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "min_fee, max_fee, page and limit must be numbers"}), 400
 
-    # Filter by availability (optional)
+    # Filter by availability: doctors with any availability window on that weekday
+    available_ids = None
     if date_str:
         from datetime import datetime
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
         weekday = date_obj.strftime("%A")
+        from app.models.doctors import Doctor
+        available_ids = {
+            doctor_id for (doctor_id,) in db.session.query(DoctorAvailability.doctor_id)
+            .join(Doctor, Doctor.id == DoctorAvailability.doctor_id)
+            .filter(DoctorAvailability.day_of_week == weekday, Doctor.status == "active").distinct()
+        }
 
-        # Join availability and ensure doctor has a free slot
-        query = query.join(DoctorAvailability).filter(
-            DoctorAvailability.day_of_week == weekday
-        )
+    result = doctor_search_index.search(
+        q=q,
+        speciality=speciality,
+        location=location,
+        fee_band=band,
+        min_fee=min_fee,
+        max_fee=max_fee,
+        restrict_to=available_ids,
+        page=page,
+        limit=limit,
+    )
 
-    doctors = query.all()
-    return jsonify([doctor.to_dict() for doctor in doctors]), 200
+    # hydrate only the requested page, in ranked order
+    from app.models.doctors import Doctor
+    doctors = {}
+    if result["ids"]:
+        doctors = {
+            d.id: d for d in Doctor.query.options(*DOCTOR_PROFILE).filter(Doctor.id.in_(result["ids"]))
+        }
+
+    return jsonify({
+        "results": [doctors[i].to_dict() for i in result["ids"] if i in doctors],
+        "total": result["total"],
+        "page": page,
+        "limit": limit,
+        "facets": result["facets"],
+    }), 200
 
 
 @doctor_bp.route("/makeapplication", methods=["POST"])
@@ -275,11 +302,17 @@ def make_doctor_application():
 
 @doctor_bp.route("/all", methods=["GET"])
 # @jwt_required()
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def get_all_doctors():
     from app.models.doctors import Doctor 
-    doctors = Doctor.query.all()
-    return jsonify([doctor.to_dict() for doctor in doctors]), 200
+    selection = DOCTOR_FIELDS.from_request()
+    return cached_json_response(DOCTORS, lambda: keyset_paginate(
+        Doctor.query.options(*selection.options()),
+        Doctor.id,
+        selection.serialize,
+    ))
 @doctor_bp.route("/availability/<int:doctor_id>", methods=["GET"])
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def get_doctor_availability(doctor_id):
     availabilities = DoctorAvailability.query.filter_by(doctor_id=doctor_id).all()
     return jsonify([a.to_dict() for a in availabilities]), 200
@@ -334,31 +367,52 @@ def generate_time_slots(start_time, end_time, duration_minutes=30):
 #     return jsonify(slots)
 
 
+# ============================
+# free/booked slots for a date range (calendar week or month views)
+# ============================
+MAX_SLOT_RANGE_DAYS = 60
+
+@doctor_bp.route("/slots/<int:doctor_id>", methods=["GET"])
+@statement_timeout(PUBLIC_READ_TIMEOUT)
+def get_slot_range(doctor_id):
+    from_str = request.args.get("from")
+    to_str = request.args.get("to")
+    if not from_str or not to_str:
+        return jsonify({"msg": "from and to query parameters are required"}), 400
+
+    try:
+        start_date = datetime.strptime(from_str, "%Y-%m-%d").date()
+        end_date = datetime.strptime(to_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    if end_date < start_date:
+        return jsonify({"msg": "'to' must not be before 'from'"}), 400
+    if (end_date - start_date).days + 1 > MAX_SLOT_RANGE_DAYS:
+        return jsonify({"msg": f"Date range cannot exceed {MAX_SLOT_RANGE_DAYS} days"}), 400
+
+    return jsonify({
+        "doctor_id": doctor_id,
+        "from": from_str,
+        "to": to_str,
+        "days": slot_index.range(doctor_id, start_date, end_date)
+    }), 200
+
+
 @doctor_bp.route("/booked-slots/<int:doctor_id>", methods=["GET"])
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def get_booked_slots(doctor_id):
     date_str = request.args.get("date")
     if not date_str:
         return jsonify({"msg": "date query parameter is required"}), 400
 
-    from datetime import datetime, time
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-
-    from app.models.appointments import Appointment
-
-    # start and end of the day
-    start_dt = datetime.combine(date_obj, time.min)
-    end_dt = datetime.combine(date_obj, time.max)
-
-    appointments = Appointment.query.filter(
-        Appointment.doctor_id == doctor_id,
-        Appointment.appointment_time >= start_dt,
-        Appointment.appointment_time <= end_dt,
-        Appointment.status.in_(["pending", "approved"])
-    ).all()
+    from datetime import datetime
+    try:
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"msg": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-    booked_slots = [
-         appt.appointment_time.strftime("%H:%M")  # 24-hour format
-        for appt in appointments
-    ]
+    # read-through cache, invalidated when a booking for this doctor/date commits
+    booked_slots = get_booked_slots_for_day(doctor_id, date_obj)
 
-    return jsonify(booked_slots), 200
\ No newline at end of file
+    return jsonify(booked_slots), 200
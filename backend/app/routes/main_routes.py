@@ -1,7 +1,19 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from app.utils.metrics import collect, render
 
 main_bp = Blueprint("main", __name__)
 
 @main_bp.route("/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "GynoCare API running"}), 200
+
+@main_bp.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus scrape target; protected by a static bearer token when METRICS_TOKEN is set
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return jsonify({"error": "Invalid metrics token"}), 401
+
+    snapshot = collect(current_app.config.get("METRICS_DIR"))
+    return Response(render(snapshot), mimetype="text/plain; version=0.0.4")
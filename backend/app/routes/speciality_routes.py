@@ -3,6 +3,8 @@ from app.extensions import db
 from flask_jwt_extended import jwt_required
 from app.utils.permissions import role_required
 from app.models.specialities import Speciality
+from app.utils.directory_cache import SPECIALITIES, cached_json_response
+from app.utils.engine import PUBLIC_READ_TIMEOUT, statement_timeout
 
 speciality_bp = Blueprint("speciality_bp", __name__, url_prefix="/api/specialities")
 
@@ -28,11 +30,14 @@ def create_speciality():
     return jsonify({"msg": "Speciality created", "speciality": speciality.to_dict()}), 201
 
 @speciality_bp.route("/all", methods=["GET"])
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def get_specialities():
-    specialities = Speciality.query.all()
-    return jsonify([s.to_dict() for s in specialities]), 200
+    return cached_json_response(
+        SPECIALITIES, lambda: [s.to_dict() for s in Speciality.query.order_by(Speciality.id)]
+    )
 
 @speciality_bp.route("/<int:speciality_id>", methods=["GET"])
+@statement_timeout(PUBLIC_READ_TIMEOUT)
 def get_speciality(speciality_id):
     speciality = Speciality.query.get(speciality_id)
     if not speciality:
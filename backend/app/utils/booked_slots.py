@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models.appointments import Appointment, RELEASED_STATUSES
+from app.utils.cache import LRUCache, ReadThroughCache
+from app.utils.replicas import primary_reads
+from app.utils.slot_index import slot_index
+
+booked_slots_cache = ReadThroughCache("booked_slots", LRUCache(maxsize=4096, ttl=60))
+
+_PENDING_KEY = "booked_slot_days"
+
+
+def cache_key(doctor_id, day):
+    return f"booked-slots:{doctor_id}:{day.isoformat()}"
+
+
+def _load_booked_slots(doctor_id, day):
+    start_dt = datetime.combine(day, datetime.min.time())
+    end_dt = start_dt + timedelta(days=1)
+    rows = db.session.query(Appointment.appointment_time).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.appointment_time >= start_dt,
+        Appointment.appointment_time < end_dt,
+        Appointment.status.notin_(RELEASED_STATUSES),
+    ).order_by(Appointment.appointment_time)
+    with primary_reads():
+        return [appointment_time.strftime("%H:%M") for (appointment_time,) in rows]
+
+
+def get_booked_slots(doctor_id, day):
+    """Booked "HH:MM" start times for a doctor on a date, served from cache."""
+    return booked_slots_cache.get_or_load(
+        cache_key(doctor_id, day),
+        lambda: _load_booked_slots(doctor_id, day),
+    )
+
+
+def _history_values(state, name):
+    """Current and previous values of an attribute during a flush."""
+    history = state.attrs[name].history
+    return list(history.added or history.unchanged or ()) + list(history.deleted or ())
+
+
+def _changed_days(obj):
+    """(doctor, date) pairs an updated Appointment used to or now occupies."""
+    state = inspect(obj)
+    if not any(state.attrs[name].history.has_changes() for name in ("status", "doctor_id", "appointment_time")):
+        return set()
+    return {
+        (int(doctor_id), appointment_time.date())
+        for doctor_id in _history_values(state, "doctor_id")
+        for appointment_time in _history_values(state, "appointment_time")
+    }
+
+
+def _collect(session, flush_context):
+    days = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            days.add((int(obj.doctor_id), obj.appointment_time.date()))
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            days.add((int(obj.doctor_id), obj.appointment_time.date()))
+    for obj in session.dirty:
+        if isinstance(obj, Appointment):
+            days |= _changed_days(obj)
+
+
+def _invalidate(session):
+    for doctor_id, day in session.info.pop(_PENDING_KEY, ()):
+        booked_slots_cache.invalidate(cache_key(doctor_id, day))
+        slot_index.invalidate_day(doctor_id, day)
+
+
+def _discard(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_invalidation_hooks(session=db.session):
+    """Drop cached booked slots once a commit inserts, moves or re-statuses an Appointment.
+
+    Affected (doctor, date) pairs are collected at flush time and only
+    invalidated after the transaction commits, so a rolled back booking
+    never evicts anything.
+    """
+    if event.contains(session, "after_flush", _collect):
+        return
+    event.listen(session, "after_flush", _collect)
+    event.listen(session, "after_commit", _invalidate)
+    event.listen(session, "after_rollback", _discard)
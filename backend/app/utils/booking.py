@@ -0,0 +1,45 @@
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.appointments import Appointment
+
+SLOT_CONSTRAINT = "uq_appointments_doctor_active_slot"
+# SQLite does not name the violated index, only its columns
+_SQLITE_SLOT_MESSAGE = "UNIQUE constraint failed: appointments.doctor_id, appointments.appointment_time"
+
+
+class SlotAlreadyBooked(Exception):
+    """Raised when another active appointment already holds the doctor's slot."""
+
+
+def book_slot(patient_id, doctor_id, appointment_time, reason, status="Pending"):
+    """Insert an appointment and let the database arbitrate concurrent bookings.
+
+    There is no read-then-insert check: the partial unique index on
+    (doctor_id, appointment_time) for active statuses rejects the losing
+    insert, so only the conflicting row is ever locked.
+    """
+    appointment = Appointment(
+        patient_id=patient_id,
+        doctor_id=doctor_id,
+        reason=reason,
+        appointment_time=appointment_time,
+        status=status,
+    )
+    db.session.add(appointment)
+    try:
+        db.session.commit()
+    except IntegrityError as error:
+        db.session.rollback()
+        if not is_slot_conflict(error):
+            raise
+        raise SlotAlreadyBooked(f"Doctor {doctor_id} is already booked at {appointment_time}")
+    return appointment
+
+
+def is_slot_conflict(error):
+    """Whether an IntegrityError came from the active-slot unique index and nothing else."""
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name == SLOT_CONSTRAINT
+    return str(error.orig) == _SQLITE_SLOT_MESSAGE
@@ -0,0 +1,115 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class CacheBackend(ABC):
+    """Storage interface used by ReadThroughCache.
+
+    Keys are strings and values are JSON-serializable, so a networked store
+    (Redis, memcached) can implement the same four methods and be swapped in
+    with ``ReadThroughCache.configure``.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached value or None."""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store ``value``; ``ttl`` in seconds, None for the backend default."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove ``key`` if present."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every key."""
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize=4096, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ReadThroughCache:
+    """Loads missing keys through a callable and counts hits and misses."""
+
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # guards the counters only; loaders run outside it
+        self._lock = threading.Lock()
+
+    def configure(self, backend):
+        self.backend = backend
+
+    def get_or_load(self, key, loader):
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        value = loader()
+        self.backend.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self.invalidations += 1
+        self.backend.delete(key)
+
+    def stats(self):
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "hits": hits,
+            "misses": misses,
+            "invalidations": invalidations,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
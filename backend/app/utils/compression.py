@@ -0,0 +1,156 @@
+import zlib
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+
+# zlib wbits per content coding: gzip framing, and the zlib framing HTTP calls "deflate"
+WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def negotiate(accept_encoding):
+    """Pick "gzip" or "deflate" from an Accept-Encoding header, or None.
+
+    The highest q-value wins and gzip wins ties. A coding is only used
+    when its q is above zero, either by name or through ``*``.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in WBITS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data, coding, level=DEFAULT_LEVEL):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[coding])
+    return compressor.compress(data) + compressor.flush()
+
+
+def _weak(etag):
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """WSGI middleware that gzip/deflate-encodes compressible responses.
+
+    Responses with a Content-Length below ``min_size`` are passed through,
+    as are responses that already carry a Content-Encoding (the directory
+    cache serves precompressed bytes), bodiless statuses, HEAD requests and
+    ``Cache-Control: no-transform``. Responses without a Content-Length
+    (streamed exports) are compressed chunk by chunk with a sync flush, so
+    they still reach the client as they are produced. A compressed
+    response's ETag is made weak, since the bytes differ from the identity
+    encoding while If-None-Match matching stays weak.
+    """
+
+    def __init__(self, app, min_size=DEFAULT_MIN_SIZE, level=DEFAULT_LEVEL):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+
+    def __call__(self, environ, start_response):
+        coding = negotiate(environ.get("HTTP_ACCEPT_ENCODING"))
+        if coding is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return self._no_write
+
+        app_iter = self.app(environ, capture)
+        status, headers = captured["status"], captured["headers"]
+        length = self._compressible_length(status, headers)
+        if length is False or (length is not None and length < self.min_size):
+            start_response(status, headers, captured["exc_info"])
+            return app_iter
+
+        headers = [(k, v) for k, v in headers if k.lower() not in ("content-length", "etag")] + [
+            ("Content-Encoding", coding),
+        ] + [("ETag", _weak(v)) for k, v in headers if k.lower() == "etag"]
+        headers = self._vary(headers)
+
+        if length is None:
+            start_response(status, headers, captured["exc_info"])
+            return self._stream(app_iter, coding)
+
+        try:
+            body = compress(b"".join(app_iter), coding, self.level)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        headers.append(("Content-Length", str(len(body))))
+        start_response(status, headers, captured["exc_info"])
+        return [body]
+
+    @staticmethod
+    def _no_write(data):
+        raise RuntimeError("CompressionMiddleware does not support the WSGI write() callable")
+
+    @staticmethod
+    def _compressible_length(status, headers):
+        """Content-Length (None when streamed) if the response may be compressed, else False."""
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        length = None
+        content_type = ""
+        for name, value in headers:
+            name = name.lower()
+            if name == "content-encoding":
+                return False
+            if name == "cache-control" and "no-transform" in value.lower():
+                return False
+            if name == "content-type":
+                content_type = value.lower()
+            elif name == "content-length":
+                length = int(value)
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return length
+
+    @staticmethod
+    def _vary(headers):
+        for position, (name, value) in enumerate(headers):
+            if name.lower() == "vary":
+                if "accept-encoding" not in value.lower():
+                    headers[position] = (name, f"{value}, Accept-Encoding")
+                return headers
+        headers.append(("Vary", "Accept-Encoding"))
+        return headers
+
+    def _stream(self, app_iter, coding):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[coding])
+        try:
+            for chunk in app_iter:
+                if chunk:
+                    yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
@@ -0,0 +1,123 @@
+import hashlib
+
+from flask import Response, current_app, request
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models.cache_version import CacheVersion
+from app.models.doctors import Doctor
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.cache import LRUCache, ReadThroughCache
+from app.utils.compression import DEFAULT_LEVEL, DEFAULT_MIN_SIZE, compress, negotiate
+from app.utils.replicas import primary_reads
+
+DOCTORS = "doctors"
+SPECIALITIES = "specialities"
+
+directory_cache = ReadThroughCache("directory", LRUCache(maxsize=256, ttl=3600))
+
+_PENDING_KEY = "directory_bumped"
+
+
+def current_version(name):
+    """Version of a namespace as stored in the database (0 before the first bump)."""
+    return db.session.query(CacheVersion.version).filter_by(name=name).scalar() or 0
+
+
+def _etag(name, version, variant):
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return f"{name}-{version}-{digest}"
+
+
+def _build_body(build):
+    with primary_reads():
+        return current_app.json.dumps(build()).encode() + b"\n"
+
+
+def cached_json_response(name, build):
+    """Serve ``build()`` as JSON through the versioned cache.
+
+    The payload is serialized once per (namespace, version, query string) and
+    kept as bytes. Every response carries an ETag derived from the same key,
+    so a client whose ``If-None-Match`` still matches gets a 304 without the
+    payload being built or even read from the cache. Writes bump the version
+    in the database, which makes every worker's cached bytes unreachable at
+    once; stale entries simply age out of the LRU.
+
+    The gzip/deflate encodings are cached next to the plain bytes, so the
+    compression middleware never has to recompress a directory payload.
+    """
+    version = current_version(name)
+    variant = request.query_string.decode()
+    etag = _etag(name, version, variant)
+    key = f"{name}:{version}:{variant}"
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body = directory_cache.get_or_load(key, lambda: _build_body(build))
+        coding = negotiate(request.headers.get("Accept-Encoding"))
+        if coding and len(body) >= current_app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE):
+            level = current_app.config.get("COMPRESS_LEVEL", DEFAULT_LEVEL)
+            body = directory_cache.get_or_load(f"{key}:{coding}", lambda: compress(body, coding, level))
+            response = Response(body, status=200, mimetype="application/json")
+            response.headers["Content-Encoding"] = coding
+        else:
+            response = Response(body, status=200, mimetype="application/json")
+    response.set_etag(etag, weak=response.headers.get("Content-Encoding") is not None)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _touched(obj, inserted_or_deleted=False):
+    """Namespaces whose payload includes ``obj``."""
+    if isinstance(obj, Speciality):
+        return {DOCTORS, SPECIALITIES}
+    if isinstance(obj, Doctor):
+        return {DOCTORS}
+    if isinstance(obj, User) and obj.role == "doctor":
+        # a doctor's user only shows up in the directory with its name and email
+        if inserted_or_deleted or any(
+            inspect(obj).attrs[attr].history.has_changes() for attr in ("name", "email", "role")
+        ):
+            return {DOCTORS}
+    return set()
+
+
+def _bump(session, flush_context):
+    names = set()
+    for obj in list(session.new) + list(session.deleted):
+        names |= _touched(obj, inserted_or_deleted=True)
+    for obj in session.dirty:
+        names |= _touched(obj)
+    # bump each namespace once per transaction, inside it, so the new
+    # version becomes visible exactly when the write does
+    bumped = session.info.setdefault(_PENDING_KEY, set())
+    names -= bumped
+    if not names:
+        return
+
+    connection = session.connection()
+    table = CacheVersion.__table__
+    for name in sorted(names):
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(name=name, version=1))
+    bumped |= names
+
+
+def _reset(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_directory_hooks(session=db.session):
+    """Bump the directory cache versions whenever a flush writes doctors, their users or specialities."""
+    if event.contains(session, "after_flush", _bump):
+        return
+    event.listen(session, "after_flush", _bump)
+    event.listen(session, "after_commit", _reset)
+    event.listen(session, "after_rollback", _reset)
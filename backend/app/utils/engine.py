@@ -0,0 +1,201 @@
+import sqlite3
+import time
+from functools import wraps
+
+from flask import g, has_app_context
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# @statement_timeout values, in seconds
+PUBLIC_READ_TIMEOUT = 2
+EXPORT_TIMEOUT = 300
+
+# sqlite3 calls the progress handler every this many VM instructions
+SQLITE_PROGRESS_STEPS = 10000
+
+_TIMEOUT_INFO_KEY = "route_statement_timeout"
+_DEADLINE_INFO_KEY = "sqlite_deadline"
+
+
+def _is_memory_sqlite(uri):
+    return uri.split("?", 1)[0] in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri
+
+
+def engine_options(uri, pool_size, max_overflow, pool_timeout, pool_recycle,
+                   pool_pre_ping, statement_timeout, sqlite_busy_timeout):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``uri``.
+
+    PostgreSQL gets a bounded, instrumented QueuePool and a server-side
+    default ``statement_timeout`` (seconds, 0 for none) set at connect.
+    File SQLite gets the same pool so the pool metrics mean something
+    locally, plus a busy timeout so writers wait on the database lock
+    instead of failing; in-memory SQLite keeps its single shared connection.
+    """
+    if uri.startswith("sqlite"):
+        options = {"connect_args": {"timeout": sqlite_busy_timeout}}
+        if _is_memory_sqlite(uri):
+            return options
+    else:
+        options = {"pool_pre_ping": pool_pre_ping}
+        if uri.startswith("postgres") and statement_timeout:
+            options["connect_args"] = {"options": f"-c statement_timeout={int(statement_timeout * 1000)}"}
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+    )
+    return options
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection.
+
+    ``metrics_label`` names the pool in /api/metrics; it is the bind key of
+    the engine, set by register_engine_hooks.
+    """
+
+    metrics_label = "default"
+
+    def _do_get(self):
+        from app.utils.metrics import request_metrics
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            request_metrics.observe_pool_timeout(self.metrics_label)
+            raise
+        request_metrics.observe_pool_wait(self.metrics_label, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def pool_gauges(engines):
+    """Checked-out connections and capacity of every instrumented pool in ``engines``."""
+    gauges = {}
+    for engine in engines:
+        pool = engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            gauges[("db_pool_checked_out", pool.metrics_label)] = pool.checkedout()
+            gauges[("db_pool_capacity", pool.metrics_label)] = pool.size() + max(pool._max_overflow, 0)
+    return gauges
+
+
+def statement_timeout(seconds):
+    """Give a view its own SQL statement timeout.
+
+    Applies to every statement the view runs, including those of a
+    response streamed after it returns, but not to the token and role
+    checks decorated around it. Use a short one on public reads so a slow
+    query cannot tie up a worker, a long one on exports::
+
+        @doctor_bp.route("/all")
+        @statement_timeout(PUBLIC_READ_TIMEOUT)
+        def get_all_doctors(): ...
+
+    A statement that runs out of time fails with an OperationalError that
+    create_app turns into a 503.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            g.statement_timeout = seconds
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_statement_timeout(error):
+    """Whether a DBAPI error was a statement cancelled by its timeout."""
+    orig = getattr(error, "orig", error)
+    return getattr(orig, "pgcode", None) == "57014" or (
+        isinstance(orig, sqlite3.OperationalError) and str(orig) == "interrupted"
+    )
+
+
+def _route_timeout():
+    return g.get("statement_timeout") if has_app_context() else None
+
+
+def _apply_timeout(conn, cursor, statement, parameters, context, executemany):
+    wanted = _route_timeout()
+    if conn.dialect.name == "sqlite":
+        conn.info[_DEADLINE_INFO_KEY] = time.monotonic() + wanted if wanted else None
+        return
+    if conn.dialect.name != "postgresql" or wanted == conn.info.get(_TIMEOUT_INFO_KEY):
+        return
+    # SET LOCAL lasts until the transaction ends; a separate cursor because
+    # ``cursor`` may be a named (server-side) one that takes a single statement
+    setting = "DEFAULT" if wanted is None else str(int(wanted * 1000))
+    raw = conn.connection.cursor()
+    try:
+        raw.execute(f"SET LOCAL statement_timeout TO {setting}")
+    finally:
+        raw.close()
+    conn.info[_TIMEOUT_INFO_KEY] = wanted
+
+
+def _clear_deadline(conn, cursor, statement, parameters, context, executemany):
+    if conn.dialect.name == "sqlite":
+        conn.info[_DEADLINE_INFO_KEY] = None
+
+
+def _statement_failed(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.dialect.name == "sqlite":
+        connection.info[_DEADLINE_INFO_KEY] = None
+
+
+def _transaction_ended(conn):
+    conn.info.pop(_TIMEOUT_INFO_KEY, None)
+
+
+def _connection_checked_in(dbapi_connection, connection_record):
+    # the pool rolls back on return, which also undoes SET LOCAL
+    connection_record.info.pop(_TIMEOUT_INFO_KEY, None)
+    connection_record.info.pop(_DEADLINE_INFO_KEY, None)
+
+
+def _install_progress_handler(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    info = connection_record.info
+
+    def expired():
+        deadline = info.get(_DEADLINE_INFO_KEY)
+        return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+    # a non-zero return interrupts the statement ("interrupted")
+    dbapi_connection.set_progress_handler(expired, SQLITE_PROGRESS_STEPS)
+
+
+def register_engine_hooks(app, db):
+    """Enforce @statement_timeout and publish pool gauges for every bind.
+
+    PostgreSQL gets ``SET LOCAL statement_timeout`` before the first
+    statement of each transaction that needs a different value; SQLite,
+    which has no statement timeout, gets a progress handler that interrupts
+    a statement past its deadline. See engine_options for the pool itself.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _apply_timeout):
+        event.listen(Engine, "before_cursor_execute", _apply_timeout)
+        event.listen(Engine, "after_cursor_execute", _clear_deadline)
+        event.listen(Engine, "handle_error", _statement_failed)
+        event.listen(Engine, "commit", _transaction_ended)
+        event.listen(Engine, "rollback", _transaction_ended)
+        event.listen(Pool, "checkin", _connection_checked_in)
+        event.listen(Pool, "connect", _install_progress_handler)
+
+    from app.utils.metrics import request_metrics
+    with app.app_context():
+        engines = dict(db.engines)
+    for key, engine in engines.items():
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics_label = key or "default"
+    request_metrics.set_gauges("db_pool", lambda: pool_gauges(engines.values()))
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+from app.extensions import db
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+YIELD_PER = 1000
+ROWS_PER_CHUNK = 500
+
+
+class ExportError(ValueError):
+    """Raised for invalid export query parameters."""
+
+
+def parse_date_range(from_str, to_str):
+    """Turn optional YYYY-MM-DD bounds into a half-open datetime range."""
+    try:
+        start = datetime.strptime(from_str, "%Y-%m-%d") if from_str else None
+        end = datetime.strptime(to_str, "%Y-%m-%d") + timedelta(days=1) if to_str else None
+    except ValueError:
+        raise ExportError("Invalid date format. Use YYYY-MM-DD")
+    if start and end and end <= start:
+        raise ExportError("'to' must not be before 'from'")
+    return start, end
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, map(_plain, row))), separators=(",", ":")) + "\n"
+
+
+def _csv_lines(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([_plain(v) for v in row])
+        yield buffer.getvalue()
+
+
+def stream_export(statement, fmt):
+    """Yield an export of ``statement`` as NDJSON or CSV text chunks.
+
+    Rows are pulled through a server-side cursor ``YIELD_PER`` at a time and
+    written out in small chunks, so memory stays flat whatever the table
+    size. ``statement`` should select plain columns, not ORM entities, so
+    nothing accumulates in the session's identity map.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+    # closed in finally: a client disconnecting mid-export closes this generator
+    # early, and the server-side cursor must not wait for garbage collection
+    try:
+        columns = list(result.keys())
+        lines = _ndjson_lines(columns, result) if fmt == "ndjson" else _csv_lines(columns, result)
+
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= ROWS_PER_CHUNK:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+    finally:
+        result.close()
@@ -0,0 +1,211 @@
+from functools import lru_cache
+
+from flask import request
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models.appointments import Appointment
+from app.models.consultation import Consultation
+from app.models.doctors import Doctor
+from app.models.payments import Payment
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.serialization import ColumnSerializer
+
+# deepest include path accepted ("consultation.appointment.doctor" is 3);
+# relations can lead back to their parent, so paths are otherwise unbounded
+MAX_INCLUDE_DEPTH = 3
+
+
+class InvalidFieldset(ValueError):
+    """Raised for an unknown name in the fields or include query parameters."""
+
+
+@lru_cache(maxsize=512)
+def _column_serializer(model, columns):
+    return ColumnSerializer(model, columns)
+
+
+class Fieldset:
+    """The columns and relationships a list endpoint may return for one model.
+
+    ``columns`` are the fields in their default output order. ``always`` are
+    loaded even when not asked for (the primary key, keyset sort keys,
+    columns a derived field reads). ``relations`` maps an include name to
+    ``(relationship attribute, fieldset name)``; ``default_include`` is what
+    is embedded when the request has no ``include`` parameter, which keeps
+    the output identical to ``to_dict()``. ``derived`` maps a field name to
+    ``(relation it reads, function)`` and is only emitted with that relation.
+    """
+
+    def __init__(self, name, model, columns, relations=None, default_include=(),
+                 always=("id",), derived=None, fallbacks=None):
+        self.name = name
+        self.model = model
+        self.columns = tuple(columns)
+        self.relations = relations or {}
+        self.default_include = tuple(default_include)
+        self.always = tuple(always)
+        self.derived = derived or {}
+        self.fallbacks = fallbacks or {}
+
+    def from_request(self):
+        """The Selection described by ``?fields=``, ``?fields[<include path>]=`` and ``?include=``."""
+        include = request.args.get("include")
+        tree = None if include is None else _include_tree(include)
+        fields = {}
+        for key, value in request.args.items():
+            if key == "fields":
+                fields[""] = value
+            elif key.startswith("fields[") and key.endswith("]"):
+                fields[key[len("fields["):-1]] = value
+        selection = self.select(tree, fields)
+        unused = set(fields) - selection.paths()
+        if unused:
+            raise InvalidFieldset(f"fields[{sorted(unused)[0]}] does not match an included relation")
+        return selection
+
+    def select(self, tree, fields, path=""):
+        label = f"fields[{path}]" if path else "fields"
+        requested = fields.get(path)
+        if requested is None:
+            columns, derived = self.columns, tuple(self.derived)
+        else:
+            names = {name.strip() for name in requested.split(",") if name.strip()}
+            unknown = names - set(self.columns) - set(self.derived)
+            if unknown:
+                raise InvalidFieldset(f"Unknown field '{sorted(unknown)[0]}' in {label}")
+            columns = tuple(name for name in self.columns if name in names)
+            derived = tuple(name for name in self.derived if name in names)
+
+        if tree is None:
+            tree = {name: None for name in self.default_include}
+        unknown = set(tree) - set(self.relations)
+        if unknown:
+            where = f" under '{path}'" if path else ""
+            raise InvalidFieldset(f"Unknown include '{sorted(unknown)[0]}'{where}")
+
+        children = {}
+        for name, subtree in tree.items():
+            fieldset = FIELDSETS[self.relations[name][1]]
+            children[name] = fieldset.select(subtree, fields, f"{path}.{name}" if path else name)
+
+        for name in derived:
+            if requested is not None and self.derived[name][0] not in children:
+                raise InvalidFieldset(f"Field '{name}' needs include={self.derived[name][0]}")
+        derived = tuple(name for name in derived if self.derived[name][0] in children)
+        return Selection(self, columns, derived, children, path)
+
+
+def _include_tree(value):
+    """"doctor.user,payment" -> {"doctor": {"user": None}, "payment": None}.
+
+    A relation listed without children embeds its own default includes.
+    """
+    tree = {}
+    for item in value.split(","):
+        parts = [part.strip() for part in item.split(".") if part.strip()]
+        if len(parts) > MAX_INCLUDE_DEPTH:
+            raise InvalidFieldset(f"Include '{item.strip()}' is nested more than {MAX_INCLUDE_DEPTH} levels deep")
+        node = tree
+        for position, part in enumerate(parts):
+            if position == len(parts) - 1:
+                node.setdefault(part, None)
+            else:
+                if node.get(part) is None:
+                    node[part] = {}
+                node = node[part]
+    return tree
+
+
+class Selection:
+    """One request's choice of columns and relations, ready to load and serialize."""
+
+    def __init__(self, fieldset, columns, derived, children, path):
+        self.fieldset = fieldset
+        self.columns = columns
+        self.derived = derived
+        self.children = children
+        self.path = path
+        self._serialize_columns = _column_serializer(fieldset.model, columns)
+
+    def paths(self):
+        found = {self.path}
+        for child in self.children.values():
+            found |= child.paths()
+        return found
+
+    def options(self):
+        """Loader options that fetch only the selected columns and relations."""
+        model = self.fieldset.model
+        loaded = dict.fromkeys(self.fieldset.always + self.columns)
+        options = [load_only(*(getattr(model, name) for name in loaded))]
+        for name, child in self.children.items():
+            relationship = getattr(model, self.fieldset.relations[name][0])
+            options.append(joinedload(relationship).options(*child.options()))
+        return options
+
+    def serialize(self, obj):
+        data = self._serialize_columns(obj)
+        for name, fallback in self.fieldset.fallbacks.items():
+            if name in data:
+                data[name] = data[name] or fallback
+        for name, child in self.children.items():
+            related = getattr(obj, self.fieldset.relations[name][0])
+            data[name] = child.serialize(related) if related is not None else None
+        for name in self.derived:
+            data[name] = self.fieldset.derived[name][1](obj)
+        return data
+
+
+USER_FIELDS = Fieldset("user", User, ("id", "name", "email"))
+
+SPECIALITY_FIELDS = Fieldset("speciality", Speciality, ("id", "name"))
+
+DOCTOR_FIELDS = Fieldset(
+    "doctor", Doctor,
+    ("id", "status", "experience_years", "currency", "consultation_fee", "profile_picture",
+     "location", "phone", "joined_at", "bio", "medicalLicenceNumber"),
+    relations={"user": ("user", "user"), "speciality": ("speciality", "speciality")},
+    default_include=("user", "speciality"),
+    always=("id", "user_id"),
+    fallbacks={"location": "location not set"},
+)
+
+PAYMENT_FIELDS = Fieldset(
+    "payment", Payment,
+    ("id", "appointment_id", "amount", "payment_method", "status", "doctor_id", "patient_id",
+     "transaction_id", "created_at", "updated_at"),
+)
+
+CONSULTATION_FIELDS = Fieldset(
+    "consultation", Consultation,
+    ("id", "appointment_id", "doctor_id", "patient_id", "symptoms", "examination", "diagnosis",
+     "prescription", "notes", "created_at", "updated_at"),
+    relations={
+        "appointment": ("appointment", "appointment"),
+        "doctor": ("doctor", "user"),
+        "patient": ("patient", "user"),
+    },
+    # start_time is the admin listing's keyset sort key
+    always=("id", "start_time"),
+)
+
+APPOINTMENT_FIELDS = Fieldset(
+    "appointment", Appointment,
+    ("id", "patient_id", "doctor_id", "reason", "appointment_time", "status",
+     "consultation_type", "created_at", "updated_at"),
+    relations={
+        "patient": ("patient", "user"),
+        "doctor": ("doctor", "doctor"),
+        "payment": ("payment", "payment"),
+        "consultation": ("consultation", "consultation"),
+    },
+    default_include=("patient", "doctor"),
+    # appointment_time is the keyset sort key of the paginated listings
+    always=("id", "appointment_time"),
+    derived={"doctor_user_id": ("doctor", lambda a: a.doctor.user_id if a.doctor else None)},
+)
+
+FIELDSETS = {fieldset.name: fieldset for fieldset in (
+    USER_FIELDS, SPECIALITY_FIELDS, DOCTOR_FIELDS, PAYMENT_FIELDS, CONSULTATION_FIELDS, APPOINTMENT_FIELDS,
+)}
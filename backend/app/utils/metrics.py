@@ -0,0 +1,300 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+
+from app.utils.query_stats import track_queries
+
+# upper bounds in seconds, roughly x2.5 apart from 1ms to 10s
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (help text, label names); one histogram per request phase, one for the pools
+HISTOGRAMS = {
+    "http_request_duration_seconds": (
+        "Time from receiving a request to returning its response.", ("method", "endpoint")),
+    "http_request_db_seconds": (
+        "Time spent executing SQL statements while handling a request.", ("method", "endpoint")),
+    "http_request_python_seconds": ("Request time not spent in SQL statements.", ("method", "endpoint")),
+    "db_pool_checkout_wait_seconds": ("Time spent waiting for a pooled database connection.", ("pool",)),
+}
+
+COUNTERS = {
+    "db_pool_timeouts_total": ("Checkouts that gave up after DB_POOL_TIMEOUT seconds.", ("pool",)),
+}
+
+# sampled when a snapshot is taken, see app/utils/engine.py
+GAUGES = {
+    "db_pool_checked_out": ("Connections currently checked out of the pool.", ("pool",)),
+    "db_pool_capacity": ("Pool size plus max overflow.", ("pool",)),
+}
+
+PREFIX = "gynocare_"
+ENDPOINT_ENVIRON_KEY = "gynocare.metrics.endpoint"
+
+
+class _Shard:
+    """One thread's counters. Only its own thread writes to it."""
+
+    def __init__(self):
+        self.requests = {}  # (method, endpoint, status) -> count
+        self.histograms = {}  # (name, *labels) -> bucket counts + [sum, count]
+        self.counters = {}  # (name, *labels) -> count
+
+
+class RequestMetrics:
+    """Per-endpoint request counts and latency histograms for this process.
+
+    Each thread records into its own shard, so the request path takes no
+    lock; a scrape adds the shards up. With ``METRICS_DIR`` set, every
+    worker also writes its totals to ``<dir>/<pid>.json`` at most every
+    ``METRICS_FLUSH_INTERVAL`` seconds and ``/api/metrics`` sums all the
+    files, which gives one view over every gunicorn worker. Files of
+    workers that have exited are kept so totals never go backwards, but
+    their gauges are skipped, since those describe pools that no longer
+    exist; empty the directory when deploying.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._next_flush = 0.0
+        self._gauges = {}  # source name -> callable returning {(name, *labels): value}
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    @staticmethod
+    def _histogram(shard, key, value):
+        counts = shard.histograms.get(key)
+        if counts is None:
+            counts = shard.histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        counts[bisect_left(BUCKETS, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def observe(self, method, endpoint, status, duration, db_time):
+        shard = self._shard()
+        key = (method, endpoint, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        self._histogram(shard, ("http_request_duration_seconds", method, endpoint), duration)
+        self._histogram(shard, ("http_request_db_seconds", method, endpoint), db_time)
+        self._histogram(shard, ("http_request_python_seconds", method, endpoint), max(duration - db_time, 0.0))
+
+    def observe_pool_wait(self, pool, seconds):
+        self._histogram(self._shard(), ("db_pool_checkout_wait_seconds", pool), seconds)
+
+    def observe_pool_timeout(self, pool):
+        counters = self._shard().counters
+        key = ("db_pool_timeouts_total", pool)
+        counters[key] = counters.get(key, 0) + 1
+
+    def set_gauges(self, source, sample):
+        """Sample ``sample()`` into every snapshot; a later call for ``source`` replaces it."""
+        self._gauges[source] = sample
+
+    def snapshot(self):
+        """This process's totals as plain JSON-friendly data."""
+        requests, histograms, counters, gauges = {}, {}, {}, {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, count in list(shard.requests.items()):
+                key = "\t".join(map(str, key))
+                requests[key] = requests.get(key, 0) + count
+            for key, counts in list(shard.histograms.items()):
+                key = "\t".join(key)
+                total = histograms.setdefault(key, [0] * len(counts))
+                for position, value in enumerate(counts):
+                    total[position] += value
+            for key, count in list(shard.counters.items()):
+                key = "\t".join(key)
+                counters[key] = counters.get(key, 0) + count
+        for sample in list(self._gauges.values()):
+            for key, value in sample().items():
+                gauges["\t".join(key)] = value
+        return {"requests": requests, "histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def maybe_flush(self, directory, interval):
+        now = time.monotonic()
+        if now < self._next_flush:
+            return
+        self._next_flush = now + interval
+        self.flush(directory)
+
+    def flush(self, directory):
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temporary, path)
+
+
+request_metrics = RequestMetrics()
+
+
+def merge(snapshots):
+    merged = {"requests": {}, "histograms": {}, "counters": {}, "gauges": {}}
+    for snapshot in snapshots:
+        for kind in ("requests", "counters", "gauges"):
+            for key, value in snapshot.get(kind, {}).items():
+                merged[kind][key] = merged[kind].get(key, 0) + value
+        for key, counts in snapshot["histograms"].items():
+            total = merged["histograms"].setdefault(key, [0] * len(counts))
+            for position, value in enumerate(counts):
+                total[position] += value
+    return merged
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def collect(directory=None):
+    """Totals for this process, or for every worker that has written to ``directory``.
+
+    Gauges only come from workers that are still running.
+    """
+    if not directory:
+        return request_metrics.snapshot()
+    request_metrics.flush(directory)
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue  # a worker is mid-write or the file was removed
+        pid = os.path.basename(path)[:-len(".json")]
+        if pid.isdigit() and not _is_running(int(pid)):
+            snapshot.pop("gauges", None)
+        snapshots.append(snapshot)
+    return merge(snapshots)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render(snapshot):
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = [
+        f"# HELP {PREFIX}http_requests_total Requests handled, by endpoint and status code.",
+        f"# TYPE {PREFIX}http_requests_total counter",
+    ]
+    for key in sorted(snapshot["requests"]):
+        method, endpoint, status = key.split("\t")
+        lines.append(
+            f'{PREFIX}http_requests_total{{method="{method}",endpoint="{_label(endpoint)}",status="{status}"}} '
+            f'{snapshot["requests"][key]}'
+        )
+
+    by_name = {}
+    for kind in ("histograms", "counters", "gauges"):
+        for key, value in snapshot.get(kind, {}).items():
+            name, *values = key.split("\t")
+            by_name.setdefault(name, []).append((values, value))
+
+    def series(name, label_names):
+        for values, value in sorted(by_name.get(name, ())):
+            yield ",".join(f'{label}="{_label(v)}"' for label, v in zip(label_names, values)), value
+
+    for name, (help_text, label_names) in HISTOGRAMS.items():
+        metric = PREFIX + name
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, counts in series(name, label_names):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {counts[-2]:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {counts[-1]}")
+
+    for kind, metrics in (("counter", COUNTERS), ("gauge", GAUGES)):
+        for name, (help_text, label_names) in metrics.items():
+            metric = PREFIX + name
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in series(name, label_names):
+                lines.append(f"{metric}{{{labels}}} {value}")
+
+    # derived from the live workers' summed gauges, so it stays right across workers
+    capacity = dict(series("db_pool_capacity", ("pool",)))
+    metric = f"{PREFIX}db_pool_saturation"
+    lines.append(f"# HELP {metric} Share of the pool's connections checked out (1 means requests queue).")
+    lines.append(f"# TYPE {metric} gauge")
+    for labels, checked_out in series("db_pool_checked_out", ("pool",)):
+        if capacity.get(labels):
+            lines.append(f"{metric}{{{labels}}} {checked_out / capacity[labels]:.4f}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """WSGI middleware recording every request into ``request_metrics``.
+
+    The endpoint label is the matched URL rule (set by a before_request
+    hook), so path parameters do not multiply the series; requests that
+    match no rule are counted as "unmatched". Timing stops when the app
+    returns its response iterable, so streamed bodies count only up to
+    their first byte.
+    """
+
+    def __init__(self, app, directory=None, flush_interval=5.0):
+        self.app = app
+        self.directory = directory
+        self.flush_interval = flush_interval
+
+    def __call__(self, environ, start_response):
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured["status"] = status
+            return start_response(status, headers, exc_info)
+
+        with track_queries() as queries:
+            started = time.perf_counter()
+            try:
+                return self.app(environ, capture)
+            finally:
+                duration = time.perf_counter() - started
+                status = captured.get("status", "500").split(" ", 1)[0]
+                endpoint = environ.get(ENDPOINT_ENVIRON_KEY, "unmatched")
+                request_metrics.observe(
+                    environ.get("REQUEST_METHOD", "GET"), endpoint, status, duration, queries.db_time,
+                )
+                if self.directory:
+                    request_metrics.maybe_flush(self.directory, self.flush_interval)
+
+
+def register_metrics(app):
+    """Label requests with their URL rule and record them; SQL time comes from app/utils/query_stats.py."""
+
+    @app.before_request
+    def label_endpoint():
+        if request.url_rule is not None:
+            request.environ[ENDPOINT_ENVIRON_KEY] = request.url_rule.rule
+
+    directory = app.config.get("METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    app.wsgi_app = MetricsMiddleware(
+        app.wsgi_app,
+        directory=directory,
+        flush_interval=app.config.get("METRICS_FLUSH_INTERVAL", 5.0),
+    )
@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised for a malformed cursor or limit query parameter."""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values):
+    """Pack the (sort key, id) of the last row into an opaque URL-safe token."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if len(values) != 2:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def get_limit():
+    raw = request.args.get("limit")
+    if raw is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidCursor("limit must be an integer")
+    if limit < 1:
+        raise InvalidCursor("limit must be positive")
+    return min(limit, MAX_LIMIT)
+
+
+def keyset_paginate(query, id_column, serialize, sort_column=None, descending=False):
+    """Return one page of ``query`` as ``{"items": [...], "next_cursor": ...}``.
+
+    Rows are ordered by (sort_column, id_column) and the page starts right
+    after the row encoded in the ``cursor`` query parameter, so every page is
+    an index range scan: there is no OFFSET and page N costs the same as
+    page 1. ``sort_column`` must be non-nullable; when omitted the id alone
+    is the sort key. ``limit`` is capped at MAX_LIMIT.
+    """
+    sort_column = sort_column if sort_column is not None else id_column
+    limit = get_limit()
+    cursor = request.args.get("cursor")
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if descending:
+            after = or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id))
+        else:
+            after = or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id))
+        query = query.filter(after)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # one extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, sort_column.key), getattr(last, id_column.key)])
+
+    return {
+        "items": [serialize(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug method strings, e.g. "scrypt", "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+DEFAULT_METHOD = "scrypt"
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE = 32
+DEFAULT_WAIT = 5.0
+
+
+class PasswordServiceBusy(RuntimeError):
+    """Raised when too many hashes are already running or queued."""
+
+
+class PasswordService:
+    """Password hashing on a small bounded thread pool.
+
+    PBKDF2 and scrypt release the GIL, so a login burst handled on request
+    threads would take every core. Here at most ``PASSWORD_HASH_WORKERS``
+    hashes run at once per process, at most ``PASSWORD_HASH_QUEUE`` more
+    wait, and a request that cannot get a place within
+    ``PASSWORD_HASH_WAIT`` seconds gets ``PasswordServiceBusy`` (a 503)
+    instead of piling up. The algorithm and cost come from
+    ``PASSWORD_HASH_METHOD``; hashes made with other parameters are
+    upgraded on the next successful login.
+
+    The bound needs a threaded server, which is why the Procfile runs
+    gunicorn's gthread workers: a sync worker serves one request at a
+    time, so its pool never has more than one hash to run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._canonical = {}
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = current_app.config.get("PASSWORD_HASH_WORKERS", DEFAULT_WORKERS)
+                    queue = current_app.config.get("PASSWORD_HASH_QUEUE", DEFAULT_QUEUE)
+                    self._slots = threading.BoundedSemaphore(workers + queue)
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _run(self, fn, *args):
+        executor = self._pool()
+        if not self._slots.acquire(timeout=current_app.config.get("PASSWORD_HASH_WAIT", DEFAULT_WAIT)):
+            raise PasswordServiceBusy("Too many password checks in progress, try again shortly")
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def method(self):
+        return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+
+    def _canonical_method(self, method):
+        """The full parameter string werkzeug stores for ``method`` ("scrypt" -> "scrypt:32768:8:1")."""
+        if method not in self._canonical:
+            self._canonical[method] = generate_password_hash("", method).split("$", 1)[0]
+        return self._canonical[method]
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method())
+
+    def verify(self, stored_hash, password):
+        if not stored_hash or password is None:
+            return False
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        return stored_hash.split("$", 1)[0] != self._canonical_method(self.method())
+
+    def verify_and_update(self, user, password):
+        """Check ``password`` against ``user.password``, upgrading an outdated hash in place.
+
+        The caller commits; the new hash goes out with the rest of the request.
+        """
+        if not self.verify(user.password, password):
+            return False
+        if self.needs_rehash(user.password):
+            user.password = self.hash(password)
+        return True
+
+
+passwords = PasswordService()
@@ -1,9 +1,84 @@
 from functools import wraps
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, get_jwt
-from flask import jsonify, request
+from flask import g, jsonify, request
 from app.models.user import User
 
+def _profile_model(role):
+    """Profile model whose id identifies the caller in that role."""
+    if role == "doctor":
+        from app.models.doctors import Doctor
+        return Doctor
+    if role == "patient":
+        from app.models.patients import Patients
+        return Patients
+    if role == "admin":
+        from app.models.admin import Admin
+        return Admin
+    return None
+
+
+def current_claims():
+    """Decoded JWT claims of the current request, verified at most once.
+
+    ``@jwt_required()`` has usually verified the token already, in which case
+    its decoded payload is reused; otherwise the token is verified here. The
+    result is kept on ``flask.g`` for the rest of the request.
+    """
+    claims = g.get("auth_claims")
+    if claims is None:
+        try:
+            claims = get_jwt()
+        except RuntimeError:
+            verify_jwt_in_request()
+            claims = get_jwt()
+        g.auth_claims = claims
+    return claims
+
+
+def current_role():
+    return current_claims().get("role")
+
+
+def current_user_id():
+    """The caller's User id as an int."""
+    return int(current_claims()["sub"])
+
+
+def current_profile_id():
+    """Id of the caller's Doctor / Patients / Admin row, or None.
+
+    Taken from the ``doctor_id`` / ``patient_id`` / ``admin_id`` claim when
+    the token carries one; older tokens fall back to a single lookup by user
+    id, cached for the request.
+    """
+    if "auth_profile_id" in g:
+        return g.auth_profile_id
+    from app.utils.tokens import PROFILE_CLAIMS
+    claims = current_claims()
+    profile_id = claims.get(PROFILE_CLAIMS.get(claims.get("role")))
+    model = _profile_model(claims.get("role"))
+    if profile_id is None and model is not None:
+        from app.extensions import db
+        profile_id = db.session.query(model.id).filter_by(user_id=current_user_id()).scalar()
+    g.auth_profile_id = profile_id
+    return profile_id
+
+
+def current_doctor_id():
+    """The caller's Doctor id (``doctors.id``, not ``users.id``), or None if not a doctor."""
+    return current_profile_id() if current_role() == "doctor" else None
+
+
+def current_patient_id():
+    """The caller's Patients id, or None if not a patient."""
+    return current_profile_id() if current_role() == "patient" else None
+
+
 def role_required(allowed_roles):
+    # accept role_required("admin") as well as role_required(["admin", "doctor"]);
+    # a bare string used to be matched as a substring
+    allowed = frozenset([allowed_roles] if isinstance(allowed_roles, str) else allowed_roles)
+
     def wrapper(fn):
         @wraps(fn)
         def decorated(*args, **kwargs):
@@ -11,20 +86,11 @@ def role_required(allowed_roles):
             if request.method == "OPTIONS":
                 return '', 200
 
-            # ✅ Explicitly verify JWT
-            verify_jwt_in_request()
-            claims = get_jwt()
-            user_roles = claims.get("role", None)
-            if not user_roles:
+            user_role = current_claims().get("role", None)
+            if not user_role:
                 return jsonify({"error": "Role not found in token"}), 401
 
-            # identity = get_jwt_identity()
-            # if not identity:
-            #     return jsonify({"error": "Authentication required"}), 401
-
-            # if identity.get("role") not in allowed_roles:
-            #     return jsonify({"error": "You do not have permission to access this resource"}), 403
-            if user_roles not in allowed_roles:
+            if user_role not in allowed:
                 return jsonify({"error": "You do not have permission to access this resource"}), 403
             return fn(*args, **kwargs)
         return decorated
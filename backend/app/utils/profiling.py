@@ -0,0 +1,175 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from flask import g, request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+
+DEFAULT_HEADER = "X-Profile"
+DEFAULT_RING_SIZE = 50
+TOP_ALLOCATIONS = 25
+
+# orders ProfileStore.text accepts
+SORT_KEYS = tuple(key.value for key in pstats.SortKey)
+
+PROFILE_ID = re.compile(r"^\d{20}-[0-9a-f]{12}$")
+
+# tracemalloc is process wide, so only one request traces allocations at a time
+_tracemalloc_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Bounded on-disk ring of request profiles.
+
+    Each profile is ``<id>.json`` (metadata and top allocations),
+    ``<id>.prof`` (cProfile output, loadable with ``pstats``) and, when
+    memory was traced, ``<id>.tracemalloc`` (a ``tracemalloc`` snapshot).
+    Ids start with a timestamp, so the oldest sort first and are removed
+    once there are more than ``ring_size``.
+    """
+
+    def __init__(self, directory, ring_size=DEFAULT_RING_SIZE):
+        self.directory = directory
+        self.ring_size = ring_size
+
+    def path(self, profile_id, suffix):
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{suffix}")
+        return path if os.path.exists(path) else None
+
+    def ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (name[:-len(".json")] for name in os.listdir(self.directory)
+             if name.endswith(".json") and PROFILE_ID.match(name[:-len(".json")])),
+            reverse=True,
+        )
+
+    def list(self):
+        profiles = []
+        for profile_id in self.ids():
+            try:
+                with open(os.path.join(self.directory, f"{profile_id}.json")) as handle:
+                    profiles.append(json.load(handle))
+            except (OSError, ValueError):
+                continue  # pruned by another worker meanwhile
+        return profiles
+
+    def save(self, profiler, metadata, snapshot=None):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:12]}"
+        metadata = dict(metadata, id=profile_id)
+        profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        if snapshot is not None:
+            snapshot.dump(os.path.join(self.directory, f"{profile_id}.tracemalloc"))
+            metadata["top_allocations"] = [
+                {"where": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+        # metadata last: a profile is listed only once its files exist
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as handle:
+            json.dump(metadata, handle)
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        for profile_id in self.ids()[self.ring_size:]:
+            for suffix in ("json", "prof", "tracemalloc"):
+                try:
+                    os.remove(os.path.join(self.directory, f"{profile_id}.{suffix}"))
+                except FileNotFoundError:
+                    pass
+
+    def text(self, profile_id, limit=50, sort="cumulative"):
+        """The top ``limit`` functions of a profile as pstats prints them; ``sort`` is one of SORT_KEYS."""
+        path = self.path(profile_id, "prof")
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def _is_admin():
+    from app.utils.permissions import current_claims
+    try:
+        return current_claims().get("role") == "admin"
+    except (JWTExtendedException, PyJWTError):
+        return False
+
+
+def register_profiling(app):
+    """Profile requests that carry ``PROFILE_HEADER`` and an admin token.
+
+    The header value is a comma list: ``cpu`` (the default) runs the view
+    under cProfile, ``memory`` also traces allocations with tracemalloc.
+    The profile id comes back in the same header of the response. Without
+    the header a request pays one header lookup.
+    """
+    header = app.config.get("PROFILE_HEADER", DEFAULT_HEADER)
+    store = ProfileStore(
+        app.config.get("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "gynocare-profiles"),
+        app.config.get("PROFILE_RING_SIZE", DEFAULT_RING_SIZE),
+    )
+    app.extensions["profile_store"] = store
+
+    @app.before_request
+    def start_profile():
+        wanted = request.headers.get(header)
+        if not wanted or request.method == "OPTIONS" or not _is_admin():
+            return
+        modes = {mode.strip().lower() for mode in wanted.split(",")}
+        traced = "memory" in modes and _tracemalloc_lock.acquire(blocking=False)
+        if traced:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        g.profile = (profiler, traced, time.perf_counter())
+        profiler.enable()
+
+    @app.after_request
+    def finish_profile(response):
+        active = g.pop("profile", None)
+        if active is None:
+            return response
+        profiler, traced, started = active
+        profiler.disable()
+        snapshot = None
+        if traced:
+            try:
+                snapshot = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+                _tracemalloc_lock.release()
+        metadata = {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.url_rule.rule if request.url_rule is not None else None,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "memory": snapshot is not None,
+        }
+        response.headers[header] = store.save(profiler, metadata, snapshot)
+        return response
+
+    @app.teardown_request
+    def abandon_profile(error=None):
+        # after_request did not run (an earlier hook raised): stop without saving
+        active = g.pop("profile", None)
+        if active is not None:
+            active[0].disable()
+            if active[1]:
+                tracemalloc.stop()
+                _tracemalloc_lock.release()
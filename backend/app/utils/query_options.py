@@ -0,0 +1,41 @@
+from sqlalchemy.orm import joinedload
+
+from app.models.admin import Admin
+from app.models.doctors import Doctor
+from app.models.doctorsapplications import DoctorApplication
+from app.models.patients import Patients
+# building loader options configures the mappers, so every related model
+# has to be importable by name first
+from app.models.appointments import Appointment  # noqa: F401
+from app.models.consultation import Consultation  # noqa: F401
+from app.models.doctoravailability import DoctorAvailability  # noqa: F401
+from app.models.payments import Payment  # noqa: F401
+from app.models.specialities import Speciality  # noqa: F401
+from app.models.user import User  # noqa: F401
+
+# Loader option sets, one per to_dict() shape. Every relationship a
+# serializer touches is loaded with the list query itself, so a list of any
+# size costs a fixed number of queries instead of one per row. List
+# endpoints that take ?fields= / ?include= build theirs from
+# app/utils/fieldsets.py instead.
+
+# Doctor.to_dict() -> user, speciality
+DOCTOR_PROFILE = (
+    joinedload(Doctor.user),
+    joinedload(Doctor.speciality),
+)
+
+# Patients.to_dict() -> user
+PATIENT_WITH_USER = (
+    joinedload(Patients.user),
+)
+
+# Admin.to_dict() -> user
+ADMIN_WITH_USER = (
+    joinedload(Admin.user),
+)
+
+# DoctorApplication.to_dict() -> speciality
+APPLICATION_WITH_SPECIALITY = (
+    joinedload(DoctorApplication.speciality),
+)
@@ -0,0 +1,145 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.sql")
+
+DEFAULT_SLOW_QUERY_SECONDS = 0.5
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+
+_current = ContextVar("query_stats", default=None)
+
+# the settings of the app that registered the hooks; the cursor events run
+# without an app context in CLI commands, so they are not read from current_app
+_settings = {
+    "slow_query_seconds": DEFAULT_SLOW_QUERY_SECONDS,
+    "n_plus_one_threshold": DEFAULT_N_PLUS_ONE_THRESHOLD,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_BIND = re.compile(r"%\(\w+\)s|%s|\$\d+")  # psycopg2 / asyncpg markers; SQLite already uses ?
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)+\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement):
+    """Statement shape with literals and bind markers as ``?`` and IN lists collapsed."""
+    shape = _STRING.sub("?", statement)
+    shape = _BIND.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """SQL statements executed while handling one request."""
+
+    __slots__ = ("count", "db_time", "statements", "route")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.statements = {}  # statement text -> executions
+        self.route = None
+
+    def suspected_n_plus_one(self, threshold):
+        """(normalized statement, executions) for statements run at least ``threshold`` times."""
+        return [
+            (normalize(statement), executions)
+            for statement, executions in self.statements.items()
+            if executions >= threshold
+        ]
+
+
+def current_query_stats():
+    return _current.get()
+
+
+@contextmanager
+def track_queries():
+    """Collect QueryStats for the statements run inside the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.db_time += elapsed
+        # bound parameters keep the text of repeated lazy loads identical,
+        # so the raw statement is a cheap key; it is normalized only for logging
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    if elapsed >= _settings["slow_query_seconds"]:
+        logger.warning(
+            "slow query %.1fms route=%s: %s",
+            elapsed * 1000, stats.route if stats is not None else None, normalize(statement),
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a failed statement
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def register_query_stats(app):
+    """Count and time SQL per request, log slow and repeated statements.
+
+    Statements slower than ``SLOW_QUERY_SECONDS`` are logged to the
+    ``app.sql`` logger with their normalized text and route, as is any
+    statement a request runs ``N_PLUS_ONE_THRESHOLD`` times or more (the
+    usual sign of a lazy load inside a to_dict loop). With
+    ``QUERY_STATS_HEADERS`` on, responses carry ``X-Query-Count`` and
+    ``X-DB-Time`` (milliseconds). Requests are tracked by the metrics
+    middleware; see app/utils/metrics.py.
+    """
+    _settings["slow_query_seconds"] = app.config.get("SLOW_QUERY_SECONDS", DEFAULT_SLOW_QUERY_SECONDS)
+    _settings["n_plus_one_threshold"] = app.config.get("N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def label_queries():
+        stats = _current.get()
+        if stats is not None:
+            stats.route = request.url_rule.rule if request.url_rule is not None else request.path
+
+    if app.config.get("QUERY_STATS_HEADERS"):
+        @app.after_request
+        def add_query_headers(response):
+            stats = _current.get()
+            if stats is not None:
+                response.headers["X-Query-Count"] = str(stats.count)
+                response.headers["X-DB-Time"] = f"{stats.db_time * 1000:.1f}"
+            return response
+
+    @app.teardown_request
+    def report_n_plus_one(error=None):
+        stats = _current.get()
+        if stats is None:
+            return
+        for statement, executions in stats.suspected_n_plus_one(_settings["n_plus_one_threshold"]):
+            logger.warning(
+                "suspected N+1 route=%s: %d executions of %s", stats.route, executions, statement,
+            )
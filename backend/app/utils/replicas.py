@@ -0,0 +1,135 @@
+import math
+from contextlib import contextmanager
+
+import jwt as pyjwt
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from app.utils.cache import LRUCache
+
+REPLICA_BIND = "replica"
+READ_METHODS = ("GET", "HEAD")
+RECENT_WRITE_COOKIE = "gynocare_recent_write"
+DEFAULT_READ_YOUR_WRITES_SECONDS = 5.0
+
+# user id -> True while that user's reads must go to the primary
+recent_writers = LRUCache(maxsize=10000, ttl=DEFAULT_READ_YOUR_WRITES_SECONDS)
+
+_WROTE_KEY = "replica_session_wrote"
+
+
+class RoutingSession(Session):
+    """Session that sends the SELECTs of replica-eligible requests to the replica bind.
+
+    A request is eligible when register_replica_routing's before_request
+    hook says so. Even then the primary serves flushes, locking reads,
+    textual SQL and every statement after the session first wrote, so a
+    GET view that does write still reads its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        return (
+            clause is not None
+            and clause.is_select
+            and getattr(clause, "_for_update_arg", None) is None
+            and not self._flushing
+            and not self.info.get(_WROTE_KEY)
+            and has_app_context()
+            and g.get("read_replica", False)
+        )
+
+
+@contextmanager
+def primary_reads():
+    """Send the block's reads to the primary, whatever the request is eligible for.
+
+    Wrap every query that fills a cache shared across requests: an entry
+    loaded from a lagging replica would outlive the invalidation that was
+    meant to remove it and be served until its TTL runs out.
+    """
+    if not has_app_context():
+        yield
+        return
+    previous = g.get("read_replica", False)
+    g.read_replica = False
+    try:
+        yield
+    finally:
+        g.read_replica = previous
+
+
+def _request_user():
+    """The ``sub`` of the request's bearer token, unverified.
+
+    Only used to pick a database: jwt_required verifies the token later,
+    after the first query has already needed a bind. A forged token can at
+    most send its bearer's reads to the primary.
+    """
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return None
+    try:
+        return pyjwt.decode(header[len("Bearer "):], options={"verify_signature": False}).get("sub")
+    except pyjwt.PyJWTError:
+        return None
+
+
+def _mark_wrote(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+def _remember_writer(session):
+    if not session.info.get(_WROTE_KEY) or not has_request_context():
+        return
+    g.recent_write = True
+    user = _request_user()
+    if user is not None:
+        window = current_app.config.get("REPLICA_READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS)
+        recent_writers.set(user, True, ttl=window)
+
+
+def register_replica_routing(app, session):
+    """Serve read-only requests from the ``replica`` bind when one is configured.
+
+    GET and HEAD requests read from the replica unless the caller committed
+    a write in the last ``REPLICA_READ_YOUR_WRITES_SECONDS``, so a patient
+    sees the appointment they just booked. That window is carried two ways:
+    a short-lived cookie set on the writing response, which every worker
+    sees, and a per-process map keyed by the token's user id for clients
+    that do not send cookies. Pick a window longer than the replica's usual
+    lag. Shared caches (directory payloads, booked slots, the slot index,
+    the search index, token versions and revoked tokens) are always filled
+    under primary_reads, so replica lag only shows in uncached reads. Without a replica bind nothing is
+    registered and every query goes to the primary.
+    """
+    if REPLICA_BIND not in (app.config.get("SQLALCHEMY_BINDS") or {}):
+        return
+
+    if not event.contains(session, "after_flush", _mark_wrote):
+        event.listen(session, "after_flush", _mark_wrote)
+        event.listen(session, "after_commit", _remember_writer)
+
+    @app.before_request
+    def choose_database():
+        g.read_replica = (
+            request.method in READ_METHODS
+            and RECENT_WRITE_COOKIE not in request.cookies
+            and not recent_writers.get(_request_user())
+        )
+
+    @app.after_request
+    def mark_recent_write(response):
+        if g.pop("recent_write", False):
+            window = app.config.get("REPLICA_READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS)
+            response.set_cookie(
+                RECENT_WRITE_COOKIE, "1", max_age=math.ceil(window), httponly=True,
+                # the frontend is served from another site, which needs SameSite=None (and https)
+                secure=request.is_secure, samesite="None" if request.is_secure else "Lax",
+            )
+        return response
@@ -0,0 +1,143 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models.revoked_token import RevokedToken
+from app.utils.replicas import primary_reads
+
+_PENDING_KEY = "revoked_token_jtis"
+
+# INSERT ... ON CONFLICT for the dialects the app runs on
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class RevocationStore:
+    """Revoked JWT ids held in memory and kept in step with ``revoked_tokens``.
+
+    Checking a token is a dict lookup. At most every
+    ``REVOCATION_SYNC_INTERVAL`` seconds a request pulls the rows revoked
+    since the previous pull (by ``revoked_at``, re-reading
+    ``REVOCATION_SYNC_OVERLAP`` seconds so rows from transactions that
+    committed late are not missed), which is how other workers' logouts
+    arrive. Revocations made by this process are added on commit. Entries
+    are dropped once the token they block has expired.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expires = {}  # jti -> expiry, unix seconds
+        self._pulled_at = None  # revoked_at watermark of the last pull
+        self._next_pull = 0.0
+
+    def __contains__(self, jti):
+        return jti in self._expires
+
+    def __len__(self):
+        return len(self._expires)
+
+    def add(self, jti, expires_at):
+        self._expires[jti] = expires_at
+
+    def clear(self):
+        with self._lock:
+            self._expires.clear()
+            self._pulled_at = None
+            self._next_pull = 0.0
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_pull:
+            self.sync()
+        return jti in self._expires
+
+    def sync(self):
+        """Pull revocations newer than the last pull and drop expired entries."""
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already pulling
+        try:
+            now = datetime.utcnow()
+            query = db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.expires_at > now
+            )
+            if self._pulled_at is not None:
+                overlap = timedelta(seconds=current_app.config.get("REVOCATION_SYNC_OVERLAP", 60))
+                query = query.filter(RevokedToken.revoked_at >= self._pulled_at - overlap)
+            # the primary: a lagging replica would move _pulled_at past rows it has not received
+            with primary_reads():
+                rows = query.all()
+            for jti, expires_at in rows:
+                self._expires[jti] = _timestamp(expires_at)
+
+            # a copy: add() writes without the lock while this runs
+            cutoff = _timestamp(now)
+            for jti, expires in list(self._expires.items()):
+                if expires <= cutoff:
+                    self._expires.pop(jti, None)
+
+            self._pulled_at = now
+            self._next_pull = time.monotonic() + current_app.config.get("REVOCATION_SYNC_INTERVAL", 5)
+        finally:
+            self._lock.release()
+
+
+revoked_tokens = RevocationStore()
+
+
+def _timestamp(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def revoke_token(jwt_data):
+    """Revoke the token described by ``jwt_data``; the caller commits.
+
+    Revoking a token twice is a no-op, so a repeated logout (say on a
+    worker that has not pulled the first one yet) still succeeds.
+    """
+    expires_at = datetime.utcfromtimestamp(jwt_data["exp"])
+    table = RevokedToken.__table__
+    insert = _INSERTS[db.session.get_bind(RevokedToken).dialect.name](table)
+    db.session.execute(insert.values(
+        jti=jwt_data["jti"],
+        user_id=int(jwt_data["sub"]) if jwt_data.get("sub") else None,
+        expires_at=expires_at,
+        revoked_at=datetime.utcnow(),
+    ).on_conflict_do_nothing(index_elements=[table.c.jti]))
+    db.session.info.setdefault(_PENDING_KEY, []).append((jwt_data["jti"], _timestamp(expires_at)))
+
+
+def prune_revoked_tokens():
+    """Delete rows for tokens that have expired anyway. Returns the number removed."""
+    removed = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return removed
+
+
+def _publish(session):
+    for jti, expires_at in session.info.pop(_PENDING_KEY, ()):
+        revoked_tokens.add(jti, expires_at)
+
+
+def _discard(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_revocation_checks(jwt, session=db.session):
+    """Reject tokens whose jti is in ``revoked_tokens``.
+
+    This process sees its own revocations as soon as they commit; other
+    workers see them after their next pull.
+    """
+
+    @jwt.token_in_blocklist_loader
+    def token_is_revoked(jwt_header, jwt_data):
+        return revoked_tokens.is_revoked(jwt_data["jti"])
+
+    if not event.contains(session, "after_commit", _publish):
+        event.listen(session, "after_commit", _publish)
+        event.listen(session, "after_rollback", _discard)
@@ -0,0 +1,228 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import event, extract, func, inspect, select
+
+from app.extensions import db
+from app.models.appointment_rollup import AppointmentRollup
+from app.models.appointments import Appointment
+from app.models.doctors import Doctor
+from app.models.payment_rollup import PaymentRollup
+from app.models.payments import Payment
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.stat_counters import REVENUE_STATUSES, add_to_rows, attribute_values, month_key
+
+BACKFILL_BATCH_SIZE = 5000
+
+# primary key of both rollup tables
+ROLLUP_KEY = ("month", "doctor_id", "status")
+
+
+def _appointment_row(appointment_time, doctor_id, status):
+    return (month_key(appointment_time), int(doctor_id), status), {"count": 1}
+
+
+def _payment_row(created_at, doctor_id, status, amount):
+    # process_payment stores the Doctor id in Payment.doctor_id
+    month = month_key(created_at or datetime.utcnow())
+    return (month, int(doctor_id), status), {"count": 1, "amount_cents": round((amount or 0) * 100)}
+
+
+# source model -> (rollup model, attributes the row depends on, values -> (key, measures))
+ROLLUPS = {
+    Appointment: (AppointmentRollup, ("appointment_time", "doctor_id", "status"), _appointment_row),
+    Payment: (PaymentRollup, ("created_at", "doctor_id", "status", "amount"), _payment_row),
+}
+
+
+def _add(deltas, obj, sign, previous=False):
+    rollup, attributes, row = ROLLUPS[type(obj)]
+    key, measures = row(*attribute_values(obj, attributes, previous))
+    bucket = deltas[(rollup, key)]
+    for name, value in measures.items():
+        bucket[name] += sign * value
+
+
+def _changed(obj):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in ROLLUPS[type(obj)][1])
+
+
+def _apply(connection, deltas):
+    """Add measure deltas to rollup rows, creating rows that do not exist yet."""
+    rows = defaultdict(list)
+    for (rollup, key), measures in sorted(deltas.items(), key=lambda item: (item[0][0].__tablename__, item[0][1])):
+        if any(measures.values()):
+            rows[rollup].append({**dict(zip(ROLLUP_KEY, key)), **measures})
+    for rollup, table_rows in rows.items():
+        table = rollup.__table__
+        # one statement per table, so every row carries every measure
+        measures = [name for name in table.c.keys() if name not in ROLLUP_KEY]
+        add_to_rows(connection, table, [{**dict.fromkeys(measures, 0), **row} for row in table_rows], measures)
+
+
+def _collect(session, flush_context):
+    deltas = defaultdict(Counter)
+    for obj in session.new:
+        if type(obj) in ROLLUPS:
+            _add(deltas, obj, 1)
+    for obj in session.deleted:
+        if type(obj) in ROLLUPS:
+            _add(deltas, obj, -1, previous=True)
+    for obj in session.dirty:
+        if type(obj) in ROLLUPS and _changed(obj):
+            _add(deltas, obj, -1, previous=True)
+            _add(deltas, obj, 1)
+    if deltas:
+        # same transaction as the source rows, like stat_counters
+        _apply(session.connection(), deltas)
+
+
+def register_rollup_hooks(session=db.session):
+    """Keep the appointment and payment rollups in step with every ORM write."""
+    if event.contains(session, "after_flush", _collect):
+        return
+    event.listen(session, "after_flush", _collect)
+
+
+def _backfill_statement(source, low, high):
+    if source is Appointment:
+        moment, measures = Appointment.appointment_time, [func.count(Appointment.id)]
+    else:
+        moment, measures = Payment.created_at, [func.count(Payment.id), func.sum(Payment.amount)]
+    year, month = extract("year", moment), extract("month", moment)
+    return (
+        select(year, month, source.doctor_id, source.status, *measures)
+        .where(source.id > low, source.id <= high, moment.isnot(None))
+        .group_by(year, month, source.doctor_id, source.status)
+    )
+
+
+def backfill_rollups(batch_size=BACKFILL_BATCH_SIZE, progress=None):
+    """Rebuild both rollup tables from the source rows, one id range per transaction.
+
+    Each batch is aggregated in SQL and merged into the rollups, so memory
+    stays flat and locks are short. Rows written while the backfill runs are
+    counted by the hooks; a status change to a row the backfill has not
+    reached yet can leave its old bucket one off, so run it while writes are
+    quiet (or run it twice). Returns the number of source rows per table.
+    """
+    totals = {}
+    for source, (rollup, _, _) in ROLLUPS.items():
+        db.session.execute(rollup.__table__.delete())
+        db.session.commit()
+
+        last_id = db.session.query(func.max(source.id)).scalar() or 0
+        rows = 0
+        for low in range(0, last_id, batch_size):
+            deltas = defaultdict(Counter)
+            for year, month, doctor_id, status, count, *amount in db.session.execute(
+                _backfill_statement(source, low, low + batch_size)
+            ):
+                bucket = deltas[(rollup, (f"{int(year):04d}-{int(month):02d}", int(doctor_id), status))]
+                bucket["count"] += count
+                if amount:
+                    bucket["amount_cents"] += round((amount[0] or 0) * 100)
+                rows += count
+            _apply(db.session.connection(), deltas)
+            db.session.commit()
+            if progress:
+                progress(source.__tablename__, min(low + batch_size, last_id), last_id)
+        totals[source.__tablename__] = rows
+    return totals
+
+
+def month_range(first, last):
+    """"YYYY-MM" labels from ``first`` to ``last`` inclusive."""
+    year, month = map(int, first.split("-"))
+    months = []
+    while f"{year:04d}-{month:02d}" <= last:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def trends(first, last, doctor_id=None, speciality_id=None, top=10):
+    """Appointment and revenue trends between two "YYYY-MM" months, read from the rollups only.
+
+    The doctors, users and specialities tables are only joined to resolve
+    speciality filters and names; they are small next to the facts.
+    """
+    months = month_range(first, last)
+    index = {month: n for n, month in enumerate(months)}
+
+    def scoped(query, rollup):
+        query = query.filter(rollup.month >= first, rollup.month <= last)
+        if doctor_id is not None:
+            query = query.filter(rollup.doctor_id == doctor_id)
+        if speciality_id is not None:
+            query = query.join(Doctor, Doctor.id == rollup.doctor_id).filter(Doctor.speciality_id == speciality_id)
+        return query
+
+    appointments = [0] * len(months)
+    by_status = defaultdict(lambda: [0] * len(months))
+    rows = scoped(
+        db.session.query(AppointmentRollup.month, AppointmentRollup.status, func.sum(AppointmentRollup.count)),
+        AppointmentRollup,
+    ).group_by(AppointmentRollup.month, AppointmentRollup.status)
+    for month, status, count in rows:
+        appointments[index[month]] += count
+        # statuses are stored in mixed case ("Pending", "pending")
+        by_status[(status or "unknown").lower()][index[month]] += count
+
+    revenue_cents = [0] * len(months)
+    payments = [0] * len(months)
+    rows = scoped(
+        db.session.query(PaymentRollup.month, func.sum(PaymentRollup.count), func.sum(PaymentRollup.amount_cents)),
+        PaymentRollup,
+    ).filter(PaymentRollup.status.in_(REVENUE_STATUSES)).group_by(PaymentRollup.month)
+    for month, count, amount_cents in rows:
+        payments[index[month]] = count
+        revenue_cents[index[month]] = amount_cents
+
+    per_doctor = defaultdict(lambda: {"appointments": 0, "revenue": 0.0})
+    rows = scoped(
+        db.session.query(AppointmentRollup.doctor_id, func.sum(AppointmentRollup.count)), AppointmentRollup
+    ).group_by(AppointmentRollup.doctor_id)
+    for doctor, count in rows:
+        per_doctor[doctor]["appointments"] = count
+    rows = scoped(
+        db.session.query(PaymentRollup.doctor_id, func.sum(PaymentRollup.amount_cents)), PaymentRollup
+    ).filter(PaymentRollup.status.in_(REVENUE_STATUSES)).group_by(PaymentRollup.doctor_id)
+    for doctor, amount_cents in rows:
+        per_doctor[doctor]["revenue"] = amount_cents / 100
+
+    doctors = dict(
+        db.session.query(Doctor.id, Doctor.speciality_id).filter(Doctor.id.in_(per_doctor))
+    ) if per_doctor else {}
+    per_speciality = defaultdict(lambda: {"appointments": 0, "revenue": 0.0})
+    for doctor, figures in per_doctor.items():
+        totals = per_speciality[doctors.get(doctor)]
+        totals["appointments"] += figures["appointments"]
+        totals["revenue"] += figures["revenue"]
+
+    top_doctors = sorted(per_doctor.items(), key=lambda item: (-item[1]["appointments"], item[0]))[:top]
+    names = dict(
+        db.session.query(Doctor.id, User.name).join(User, Doctor.user_id == User.id)
+        .filter(Doctor.id.in_([doctor for doctor, _ in top_doctors]))
+    ) if top_doctors else {}
+    speciality_names = dict(db.session.query(Speciality.id, Speciality.name))
+
+    return {
+        "months": months,
+        "appointments": appointments,
+        "appointments_by_status": dict(sorted(by_status.items())),
+        "payments": payments,
+        "revenue": [cents / 100 for cents in revenue_cents],
+        "top_doctors": [
+            {"doctor_id": doctor, "name": names.get(doctor), **figures} for doctor, figures in top_doctors
+        ],
+        "by_speciality": sorted(
+            (
+                {"speciality_id": sid, "name": speciality_names.get(sid), **figures}
+                for sid, figures in per_speciality.items()
+            ),
+            key=lambda item: -item["appointments"],
+        ),
+    }
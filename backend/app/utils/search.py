@@ -0,0 +1,491 @@
+import bisect
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.doctors import Doctor
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.cache import LRUCache
+from app.utils.replicas import primary_reads
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# relevance weight of a query token matching each indexed field
+FIELD_WEIGHTS = {
+    "name": 4.0,
+    "speciality": 3.0,
+    "location": 2.0,
+    "bio": 1.0,
+}
+
+# (label, lower bound inclusive, upper bound exclusive)
+FEE_BANDS = (
+    ("under-1000", 0, 1000),
+    ("1000-2499", 1000, 2500),
+    ("2500-4999", 2500, 5000),
+    ("5000-plus", 5000, float("inf")),
+)
+
+_PENDING_KEY = "search_dirty_doctors"
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def fee_band(fee):
+    if fee is None:
+        return None
+    for label, low, high in FEE_BANDS:
+        if low <= fee < high:
+            return label
+    return None
+
+
+class DoctorSearchIndex:
+    """In-process inverted index over active doctors.
+
+    Postings map a token to ``{doctor_id: weight}`` across the doctor's name,
+    speciality, location and bio. Facet postings (speciality, location
+    token, fee band) let filters intersect id sets instead of scanning rows.
+    The index is built on first use, patched incrementally for doctors
+    marked dirty by the commit hooks, and rebuilt from scratch once it is
+    older than ``SEARCH_INDEX_MAX_AGE`` seconds so changes committed by other
+    workers show up. A rebuild fills a separate index and swaps it in, so
+    searches keep being answered from the old one while it runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # held by the thread rebuilding; others keep searching the current index
+        self._build_lock = threading.Lock()
+        self._built_at = None
+        self._dirty = set()
+        self._generation = 0
+        self._results = LRUCache(maxsize=1024, ttl=300)
+        self._reset()
+
+    def _reset(self):
+        """Empty every structure a rebuild replaces (see _STATE)."""
+        self._docs = {}
+        self._postings = defaultdict(dict)
+        self._vocabulary = []
+        self._vocabulary_stale = False
+        self._by_speciality = defaultdict(set)
+        self._speciality_ids = {}
+        self._speciality_names = {}
+        self._by_location = defaultdict(set)
+        self._by_location_value = defaultdict(set)
+        self._by_fee_band = defaultdict(set)
+        self._facet_combo = {}
+        self._combo_ids = {}
+        self._combo_values = []
+        self._by_user = {}
+        self._default_order = []
+        self._rank = {}
+        self._default_order_stale = False
+        self._prefix_postings = {}
+        self._fee_values = []
+        self._fee_ids = []
+
+    # ---------- building ----------
+
+    def _fetch(self, doctor_ids=None):
+        """Index rows for every doctor, or for ``doctor_ids``; read from the primary."""
+        query = db.session.query(
+            Doctor.id,
+            Doctor.user_id,
+            Doctor.status,
+            Doctor.bio,
+            Doctor.location,
+            Doctor.consultation_fee,
+            Doctor.rating,
+            Doctor.speciality_id,
+            User.name,
+            Speciality.name,
+        ).join(User, Doctor.user_id == User.id).join(Speciality, Doctor.speciality_id == Speciality.id)
+        if doctor_ids is not None:
+            query = query.filter(Doctor.id.in_(doctor_ids))
+        with primary_reads():
+            return query.all()
+
+    def _add(self, row):
+        doctor_id, user_id, status, bio, location, fee, rating, speciality_id, name, speciality = row
+        self._by_user[user_id] = doctor_id
+        if status != "active":
+            return
+
+        doc = {
+            "id": doctor_id,
+            "rating": rating or 0.0,
+            "fee": fee,
+            "speciality_id": speciality_id,
+            "speciality": speciality,
+            "location": location,
+            "fee_band": fee_band(fee),
+        }
+        weights = {}
+        for field, text in (("name", name), ("speciality", speciality), ("location", location), ("bio", bio)):
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._vocabulary_stale = True
+            self._postings[token][doctor_id] = weight
+        doc["tokens"] = set(weights)
+        doc["location_tokens"] = set(tokenize(location))
+
+        self._docs[doctor_id] = doc
+        self._by_speciality[speciality_id].add(doctor_id)
+        self._speciality_ids[speciality.lower()] = speciality_id
+        self._speciality_names[speciality_id] = speciality
+        for token in doc["location_tokens"]:
+            self._by_location[token].add(doctor_id)
+        if location:
+            self._by_location_value[location].add(doctor_id)
+        combo = (speciality_id, location or None, doc["fee_band"])
+        if combo not in self._combo_ids:
+            self._combo_ids[combo] = len(self._combo_values)
+            self._combo_values.append(combo)
+        self._facet_combo[doctor_id] = self._combo_ids[combo]
+        if doc["fee_band"]:
+            self._by_fee_band[doc["fee_band"]].add(doctor_id)
+        self._changed()
+
+    def _remove(self, doctor_id):
+        doc = self._docs.pop(doctor_id, None)
+        if doc is None:
+            return
+        for token in doc["tokens"]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doctor_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_stale = True
+        self._by_speciality[doc["speciality_id"]].discard(doctor_id)
+        for token in doc["location_tokens"]:
+            self._by_location[token].discard(doctor_id)
+        if doc["location"]:
+            self._by_location_value[doc["location"]].discard(doctor_id)
+        self._facet_combo.pop(doctor_id, None)
+        if doc["fee_band"]:
+            self._by_fee_band[doc["fee_band"]].discard(doctor_id)
+        self._changed()
+
+    def _changed(self):
+        # cached prefix postings and search results describe the old index
+        self._default_order_stale = True
+        self._prefix_postings.clear()
+        self._fee_values = None
+        self._generation += 1
+
+    def rebuild(self):
+        with self._build_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        # doctors marked dirty from here on are re-read by the next _refresh,
+        # since the fetch below may have missed their commit
+        with self._lock:
+            self._dirty.clear()
+        staging = DoctorSearchIndex()
+        for row in self._fetch():
+            staging._add(row)
+        with self._lock:
+            for name in _STATE:
+                setattr(self, name, getattr(staging, name))
+            self._changed()
+            self._built_at = time.monotonic()
+
+    def _refresh(self):
+        max_age = current_app.config.get("SEARCH_INDEX_MAX_AGE", 300)
+        if self._built_at is None:
+            # nothing to answer from yet, so wait for whoever is building
+            with self._build_lock:
+                if self._built_at is None:
+                    self._rebuild()
+            return
+        if time.monotonic() - self._built_at > max_age and self._build_lock.acquire(blocking=False):
+            try:
+                self._rebuild()
+            finally:
+                self._build_lock.release()
+            return
+        if self._dirty:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            rows = self._fetch(dirty)
+            with self._lock:
+                for doctor_id in dirty:
+                    self._remove(doctor_id)
+                for row in rows:
+                    self._add(row)
+
+    def mark_dirty(self, doctor_ids):
+        with self._lock:
+            self._dirty.update(doctor_ids)
+
+    def doctors_for_user(self, user_id):
+        return self._by_user.get(user_id)
+
+    def doctors_for_speciality(self, speciality_id):
+        return set(self._by_speciality.get(speciality_id, ()))
+
+    # ---------- querying ----------
+
+    def _expand(self, token, prefix):
+        """Postings for a token; the last query token also matches as a prefix."""
+        exact = self._postings.get(token, {})
+        if not prefix:
+            return exact
+        if token in self._prefix_postings:
+            return self._prefix_postings[token]
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+
+        merged = None
+        i = bisect.bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            word = self._vocabulary[i]
+            i += 1
+            if word == token:
+                continue
+            if merged is None:
+                merged = dict(exact)
+            for doctor_id, weight in self._postings[word].items():
+                # a prefix hit ranks below a whole-word hit
+                weight *= 0.5
+                if weight > merged.get(doctor_id, 0.0):
+                    merged[doctor_id] = weight
+        merged = exact if merged is None else merged
+        # typeahead repeats the same prefixes ("g", "gr", "gra", ...)
+        self._prefix_postings[token] = merged
+        return merged
+
+    def _ordered_ids(self):
+        """Doctor ids by rating (best first); the order used when there is no text query."""
+        if self._default_order_stale:
+            self._default_order = sorted(self._docs, key=lambda i: (-self._docs[i]["rating"], i))
+            self._rank = {doctor_id: n for n, doctor_id in enumerate(self._default_order)}
+            self._default_order_stale = False
+        return self._default_order
+
+    def _fee_range(self, low, high):
+        """Ids whose fee lies in [low, high], sliced from a fee-sorted list."""
+        if self._fee_values is None:
+            by_fee = sorted((doc["fee"], i) for i, doc in self._docs.items() if doc["fee"] is not None)
+            self._fee_values = [fee for fee, _ in by_fee]
+            self._fee_ids = [i for _, i in by_fee]
+        start = bisect.bisect_left(self._fee_values, low)
+        end = bisect.bisect_right(self._fee_values, high)
+        return set(self._fee_ids[start:end])
+
+    def _rank_scored(self, scores, ids, stop):
+        """The first ``stop`` ids ranked by score, then rating.
+
+        A dense match (a common word) is paged by walking the rating order
+        and dropping each id into its score bucket, stopping once the buckets
+        ahead of ``stop`` are complete; a sparse match is simply sorted with
+        two C-level keys (rating rank, then a stable sort by score).
+        """
+        order = self._ordered_ids()
+        if len(ids) * 4 < len(order):
+            ranked = sorted(ids, key=self._rank.__getitem__)
+            ranked.sort(key=scores.__getitem__, reverse=True)
+            return ranked[:stop]
+
+        distinct = set(scores.values())
+        if len(distinct) == 1:
+            sizes = {distinct.pop(): len(ids)}
+        else:
+            sizes = Counter(map(scores.__getitem__, ids))
+        buckets = {score: [] for score in sizes}
+        ranked_scores = sorted(sizes, reverse=True)
+        for n, doctor_id in enumerate(order):
+            if doctor_id in ids:
+                buckets[scores[doctor_id]].append(doctor_id)
+            if n % 256 == 255 and self._page_complete(buckets, sizes, ranked_scores, stop):
+                break
+        ranked = []
+        for score in ranked_scores:
+            ranked.extend(buckets[score])
+            if len(ranked) >= stop:
+                break
+        return ranked[:stop]
+
+    @staticmethod
+    def _page_complete(buckets, sizes, ranked_scores, stop):
+        """Whether the first ``stop`` ranked ids are already known."""
+        seen = 0
+        for score in ranked_scores:
+            if len(buckets[score]) >= stop - seen:
+                return True
+            if len(buckets[score]) < sizes[score]:
+                return False
+            seen += sizes[score]
+        return True
+
+    def _facets(self, ids):
+        """Facet counts for the matched ids.
+
+        Every doctor carries one small int standing for its (speciality,
+        location, fee band) combination, so a single C-level pass counts
+        combinations and the few distinct ones are folded into the facets.
+        """
+        specialities, locations, fee_bands = Counter(), Counter(), Counter()
+        if ids is self._docs:
+            for sid, members in self._by_speciality.items():
+                specialities[sid] = len(members)
+            for loc, members in self._by_location_value.items():
+                locations[loc] = len(members)
+            for band, members in self._by_fee_band.items():
+                fee_bands[band] = len(members)
+        else:
+            for combo, n in Counter(map(self._facet_combo.__getitem__, ids)).items():
+                sid, loc, band = self._combo_values[combo]
+                specialities[sid] += n
+                locations[loc] += n
+                fee_bands[band] += n
+            locations.pop(None, None)
+            fee_bands.pop(None, None)
+
+        return {
+            "speciality": {self._speciality_names[sid]: n for sid, n in specialities.most_common() if n},
+            "location": {loc: n for loc, n in locations.most_common(20) if n},
+            "fee_band": {label: fee_bands[label] for label, _, _ in FEE_BANDS if fee_bands[label]},
+        }
+
+    def search(self, q=None, speciality=None, location=None, fee_band=None, min_fee=None, max_fee=None,
+               restrict_to=None, page=1, limit=20):
+        """Return ``{"ids", "total", "facets"}`` for one page of matching doctors.
+
+        ``speciality`` is a speciality id, or text matched case-insensitively
+        anywhere in the speciality's name, ``location`` must match all
+        of its tokens, ``restrict_to`` is an optional set of allowed ids (for
+        example doctors available on a weekday). Results are cached per
+        index generation, so any re-index makes earlier entries unreachable.
+        """
+        self._refresh()
+        with self._lock:
+            key = None
+            if restrict_to is None:
+                key = repr((self._generation, q, speciality, location, fee_band, min_fee, max_fee, page, limit))
+                cached = self._results.get(key)
+                if cached is not None:
+                    return cached
+            result = self._search(q, speciality, location, fee_band, min_fee, max_fee, restrict_to, page, limit)
+            if key is not None:
+                self._results.set(key, result)
+            return result
+
+    def _search(self, q, speciality, location, fee_band, min_fee, max_fee, restrict_to, page, limit):
+        scores = None
+        tokens = tokenize(q)
+        for n, token in enumerate(tokens):
+            postings = self._expand(token, prefix=n == len(tokens) - 1)
+            if scores is None:
+                scores = postings
+            else:
+                scores = {i: s + postings[i] for i, s in scores.items() if i in postings}
+            if not scores:
+                break
+
+        candidates = set(scores) if scores is not None else None
+
+        def narrow(ids):
+            nonlocal candidates
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        if speciality:
+            if str(speciality).isdigit():
+                narrow(self._by_speciality.get(int(speciality), set()))
+            else:
+                # a substring of the name, like the ILIKE filter this index replaced
+                needle = speciality.strip().lower()
+                narrow(set().union(*(
+                    self._by_speciality.get(speciality_id, ())
+                    for name, speciality_id in self._speciality_ids.items() if needle in name
+                )))
+        for token in tokenize(location):
+            narrow(self._by_location.get(token, set()))
+        if fee_band:
+            narrow(self._by_fee_band.get(fee_band, set()))
+        if restrict_to is not None:
+            # the caller's ids may include doctors that are not indexed (inactive ones)
+            narrow(set(restrict_to) & self._docs.keys())
+        if min_fee is not None or max_fee is not None:
+            low = min_fee if min_fee is not None else float("-inf")
+            high = max_fee if max_fee is not None else float("inf")
+            narrow(self._fee_range(low, high))
+
+        offset = (page - 1) * limit
+        if scores is not None:
+            matched = candidates if candidates is not None else set()
+            page_ids = self._rank_scored(scores, matched, offset + limit)[offset:]
+        elif candidates is None:
+            matched = self._docs
+            page_ids = self._ordered_ids()[offset:offset + limit]
+        else:
+            matched = candidates
+            page_ids = []
+            skipped = 0
+            for doctor_id in self._ordered_ids():
+                if doctor_id in matched:
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    page_ids.append(doctor_id)
+                    if len(page_ids) == limit:
+                        break
+
+        return {
+            "ids": page_ids,
+            "total": len(matched),
+            "facets": self._facets(matched),
+        }
+
+
+# attributes set by _reset: everything a rebuild swaps in from the staging index
+_STATE = tuple(vars(DoctorSearchIndex()).keys() - {"_lock", "_build_lock", "_built_at", "_dirty", "_generation", "_results"})
+
+doctor_search_index = DoctorSearchIndex()
+
+
+def _collect(session, flush_context):
+    dirty = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Doctor):
+            dirty.add(obj.id)
+        elif isinstance(obj, User):
+            doctor_id = doctor_search_index.doctors_for_user(obj.id)
+            if doctor_id is not None:
+                dirty.add(doctor_id)
+        elif isinstance(obj, Speciality):
+            dirty |= doctor_search_index.doctors_for_speciality(obj.id)
+
+
+def _apply(session):
+    dirty = session.info.pop(_PENDING_KEY, None)
+    if dirty:
+        doctor_search_index.mark_dirty(dirty)
+
+
+def _discard(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_search_hooks(session=db.session):
+    """Mark doctors for re-indexing once a commit touches them, their user or speciality."""
+    if event.contains(session, "after_flush", _collect):
+        return
+    event.listen(session, "after_flush", _collect)
+    event.listen(session, "after_commit", _apply)
+    event.listen(session, "after_rollback", _discard)
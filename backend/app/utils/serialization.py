@@ -0,0 +1,104 @@
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from operator import attrgetter
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, DateTime, Time, inspect
+
+
+def format_datetime(value):
+    """ISO-8601 in UTC. Naive values are UTC here (``datetime.utcnow``), so they get a ``Z``.
+
+    The default provider sent these as HTTP dates ("Tue, 20 Oct 2026
+    10:00:00 GMT"); both parse to the same instant with ``new Date()``.
+    """
+    if value.tzinfo is None:
+        return value.isoformat() + "Z"
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _format_date(value):
+    return value.isoformat()
+
+
+_FORMATTERS = {
+    DateTime: format_datetime,
+    Date: _format_date,
+    Time: _format_date,
+}
+
+
+class ColumnSerializer:
+    """Serializer for a fixed list of a model's column attributes.
+
+    The getter and the per-column formatters are worked out once, on first
+    use, from the mapped column types, so serializing a row is one
+    ``attrgetter`` call plus a formatter call for each date/time column
+    that is set. Datetimes come out as strings, so the JSON encoder never
+    has to fall back to ``default()`` for them.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self._getter = None
+        self._formatted = ()
+
+    def _build(self):
+        columns = inspect(self.model).columns
+        formatted = []
+        for position, name in enumerate(self.fields):
+            column_type = type(columns[name].type)
+            for sql_type, formatter in _FORMATTERS.items():
+                if issubclass(column_type, sql_type):
+                    formatted.append((position, formatter))
+                    break
+        self._formatted = tuple(formatted)
+        if not self.fields:
+            # e.g. ?fields=doctor_user_id, a derived field only
+            self._getter = lambda obj: ()
+            return
+        getter = attrgetter(*self.fields)
+        # attrgetter with a single name returns the value, not a 1-tuple
+        self._getter = getter if len(self.fields) > 1 else lambda obj: (getter(obj),)
+
+    def __call__(self, obj):
+        if self._getter is None:
+            self._build()
+        values = self._getter(obj)
+        if self._formatted:
+            values = list(values)
+            for position, formatter in self._formatted:
+                if values[position] is not None:
+                    values[position] = formatter(values[position])
+        return dict(zip(self.fields, values))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact JSON with ISO-8601 dates.
+
+    Keys are left in ``to_dict()`` order instead of being sorted, and
+    responses carry no whitespace, in debug mode too.
+    """
+
+    sort_keys = False
+    compact = True
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return format_datetime(o)
+        if isinstance(o, (date, time)):
+            return o.isoformat()
+        if isinstance(o, (Decimal, UUID)):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
@@ -0,0 +1,193 @@
+import threading
+import time as _time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from app.extensions import db
+from app.models.appointments import Appointment, RELEASED_STATUSES
+from app.models.doctoravailability import DoctorAvailability
+from app.utils.cache import LRUCache
+from app.utils.replicas import primary_reads
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# (doctor, date) booked bitmaps kept per process; range() adds up to a
+# window's worth of dates at a time, so the least recently used are dropped
+BOOKED_MAXSIZE = 20000
+
+# "HH:MM" label for every slot position, built once instead of strftime per slot
+SLOT_LABELS = tuple(
+    f"{(i * SLOT_MINUTES) // 60:02d}:{(i * SLOT_MINUTES) % 60:02d}" for i in range(SLOTS_PER_DAY)
+)
+
+
+def slot_position(t):
+    """Slot number a time of day falls into (0 = 00:00-00:30)."""
+    return (t.hour * 60 + t.minute) // SLOT_MINUTES
+
+
+def window_mask(start_time, end_time):
+    """Bitmap of the slots that fit completely inside [start_time, end_time)."""
+    first = -(-(start_time.hour * 60 + start_time.minute) // SLOT_MINUTES)
+    last = (end_time.hour * 60 + end_time.minute) // SLOT_MINUTES
+    if last <= first:
+        return 0
+    return ((1 << last) - 1) ^ ((1 << first) - 1)
+
+
+def iter_slots(mask):
+    """Yield slot positions set in a bitmap, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def booked_masks(doctor_id, start_date, end_date):
+    """Bitmaps of booked slots per date in [start_date, end_date], from one range query."""
+    start_dt = datetime.combine(start_date, datetime.min.time())
+    end_dt = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+
+    rows = db.session.query(Appointment.appointment_time).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.appointment_time >= start_dt,
+        Appointment.appointment_time < end_dt,
+        Appointment.status.notin_(RELEASED_STATUSES),
+    )
+
+    # the masks are cached, so they come from the primary
+    masks = {}
+    with primary_reads():
+        for (appointment_time,) in rows:
+            day = appointment_time.date()
+            masks[day] = masks.get(day, 0) | (1 << slot_position(appointment_time))
+    return masks
+
+
+class SlotIndex:
+    """Per-doctor weekly availability compiled into slot bitmaps.
+
+    For each doctor and weekday the index keeps the union bitmap of all
+    availability windows plus the windows themselves (so responses can still
+    report which window a free slot belongs to). Booked bitmaps are kept per
+    (doctor, date) in a bounded LRU. Entries are rebuilt lazily after an
+    invalidation or once their TTL has passed, the TTL bounding staleness
+    between gunicorn workers.
+    """
+
+    def __init__(self):
+        self._weekly = {}
+        self._booked = LRUCache(maxsize=BOOKED_MAXSIZE, ttl=10)
+        self._lock = threading.Lock()
+
+    def _ttl(self):
+        return current_app.config.get("SLOT_INDEX_TTL", 300)
+
+    def _booked_ttl(self):
+        return current_app.config.get("SLOT_INDEX_BOOKED_TTL", 10)
+
+    def _build(self, doctor_id):
+        rows = db.session.query(
+            DoctorAvailability.day_of_week,
+            DoctorAvailability.start_time,
+            DoctorAvailability.end_time,
+        ).filter(DoctorAvailability.doctor_id == doctor_id)
+
+        days = {}
+        with primary_reads():
+            rows = rows.all()
+        for day_of_week, start_time, end_time in rows:
+            mask = window_mask(start_time, end_time)
+            union, windows = days.get(day_of_week, (0, []))
+            windows.append((mask, day_of_week, start_time.strftime("%H:%M"), end_time.strftime("%H:%M")))
+            days[day_of_week] = (union | mask, windows)
+        return days
+
+    def weekly(self, doctor_id):
+        """Return ``{day_of_week: (union_mask, windows)}`` for a doctor."""
+        now = _time.monotonic()
+        entry = self._weekly.get(doctor_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        days = self._build(doctor_id)
+        with self._lock:
+            self._weekly[doctor_id] = (now + self._ttl(), days)
+        return days
+
+    def day(self, doctor_id, date):
+        """Return ``(union_mask, windows)`` for a doctor on a calendar date."""
+        return self.weekly(doctor_id).get(WEEKDAYS[date.weekday()], (0, []))
+
+    def booked(self, doctor_id, date):
+        """Bitmap of booked slots for a doctor on a calendar date."""
+        mask = self._booked.get((doctor_id, date))
+        if mask is not None:
+            return mask
+
+        mask = booked_masks(doctor_id, date, date).get(date, 0)
+        self._booked.set((doctor_id, date), mask, ttl=self._booked_ttl())
+        return mask
+
+    def free_slots(self, doctor_id, date):
+        """Free slots for one date, or ``None`` when the doctor has no availability that day."""
+        union, windows = self.day(doctor_id, date)
+        if not union:
+            return None
+
+        booked = self.booked(doctor_id, date)
+        free = union & ~booked
+        return [
+            {
+                "day_of_week": day_of_week,
+                "start_time": start_label,
+                "end_time": end_label,
+                "available_time": SLOT_LABELS[i],
+            }
+            for mask, day_of_week, start_label, end_label in windows
+            for i in iter_slots(mask & free)
+        ]
+
+    def range(self, doctor_id, start_date, end_date):
+        """Per-day free/booked slot map for every date in [start_date, end_date].
+
+        Availability comes from the compiled weekly bitmaps and all bookings in
+        the window are read with one range query, which also refreshes the
+        per-day booked bitmaps used by ``free_slots``.
+        """
+        weekly = self.weekly(doctor_id)
+        booked = booked_masks(doctor_id, start_date, end_date)
+
+        ttl = self._booked_ttl()
+        days = {}
+        day = start_date
+        while day <= end_date:
+            day_of_week = WEEKDAYS[day.weekday()]
+            union = weekly.get(day_of_week, (0, []))[0]
+            booked_mask = booked.get(day, 0)
+            days[day.isoformat()] = {
+                "day_of_week": day_of_week,
+                "free": [SLOT_LABELS[i] for i in iter_slots(union & ~booked_mask)],
+                "booked": [SLOT_LABELS[i] for i in iter_slots(booked_mask)],
+            }
+            self._booked.set((doctor_id, day), booked_mask, ttl=ttl)
+            day += timedelta(days=1)
+        return days
+
+    def invalidate(self, doctor_id=None):
+        """Drop a doctor's compiled availability (or everything when doctor_id is None)."""
+        with self._lock:
+            if doctor_id is None:
+                self._weekly.clear()
+                self._booked.clear()
+            else:
+                self._weekly.pop(doctor_id, None)
+
+    def invalidate_day(self, doctor_id, date):
+        """Drop the booked bitmap of one doctor/date after a booking changes."""
+        self._booked.delete((doctor_id, date))
+
+
+slot_index = SlotIndex()
@@ -0,0 +1,247 @@
+import random
+from collections import Counter
+
+from sqlalchemy import BigInteger, cast, event, extract, func, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models.appointments import Appointment
+from app.models.consultation import Consultation
+from app.models.doctorsapplications import DoctorApplication
+from app.models.payments import Payment
+from app.models.stat_counter import StatCounter
+from app.models.user import User
+
+
+# payment statuses that count towards revenue
+REVENUE_STATUSES = ("paid", "completed")
+
+# rows per counter; each flush adds to one at random so concurrent writers
+# rarely wait on each other's row lock, and readers sum them
+COUNTER_SHARDS = 8
+
+# INSERT ... ON CONFLICT for the dialects the app runs on
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# a counter's value across its shards (SUM of a bigint is numeric on PostgreSQL)
+_TOTAL = cast(func.sum(StatCounter.value), BigInteger)
+
+
+def month_key(value):
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _user_counters(role):
+    return ["users", f"users:role:{role}"]
+
+
+def _appointment_counters(appointment_time, status):
+    keys = ["appointments", f"appointments:status:{status}"]
+    if appointment_time is not None:
+        keys.append(f"appointments:month:{month_key(appointment_time)}")
+    return keys
+
+
+def _consultation_counters():
+    return ["consultations"]
+
+
+def _application_counters(status):
+    return [f"doctor_applications:status:{status}"] if status else []
+
+
+def _payment_counters(status, amount):
+    # revenue is kept in cents so it fits the integer counter column
+    return {
+        "payments": 1,
+        f"payments:status:{status}": 1,
+        f"payments:revenue_cents:{status}": round((amount or 0) * 100),
+    }
+
+
+# model -> (attributes the counters depend on, attribute values -> counter
+# names, or {name: amount} for counters that grow by more than one)
+TRACKED = {
+    User: (("role",), _user_counters),
+    Appointment: (("appointment_time", "status"), _appointment_counters),
+    Consultation: ((), _consultation_counters),
+    DoctorApplication: (("status",), _application_counters),
+    Payment: (("status", "amount"), _payment_counters),
+}
+
+
+def attribute_values(obj, attributes, previous=False):
+    """Values of ``attributes`` during a flush; ``previous`` gives them as they were before it."""
+    state = inspect(obj)
+    values = []
+    for name in attributes:
+        history = state.attrs[name].history
+        if previous and history.deleted:
+            values.append(history.deleted[0])
+        else:
+            values.append(getattr(obj, name))
+    return values
+
+
+def _counters_for(obj, previous=False):
+    attributes, counters = TRACKED[type(obj)]
+    return counters(*attribute_values(obj, attributes, previous))
+
+
+def add_to_rows(connection, table, rows, measures):
+    """Insert ``rows`` into ``table``, adding their ``measures`` to rows whose primary key exists.
+
+    A single INSERT ... ON CONFLICT DO UPDATE, so two transactions creating
+    the same row cannot both insert it.
+    """
+    insert = _INSERTS[connection.dialect.name](table)
+    statement = insert.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={name: table.c[name] + insert.excluded[name] for name in measures},
+    )
+    connection.execute(statement, rows)
+
+
+def _collect_deltas(session):
+    deltas = Counter()
+    for obj in session.new:
+        if type(obj) in TRACKED:
+            deltas.update(_counters_for(obj))
+    for obj in session.deleted:
+        if type(obj) in TRACKED:
+            deltas.subtract(_counters_for(obj, previous=True))
+    for obj in session.dirty:
+        if type(obj) in TRACKED and TRACKED[type(obj)][0]:
+            deltas.subtract(_counters_for(obj, previous=True))
+            deltas.update(_counters_for(obj))
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+def _apply_deltas(session, flush_context):
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+    # same connection and transaction as the rows being counted, so a
+    # rollback undoes both; names are sorted so concurrent writers lock the
+    # counter rows in the same order
+    shard = random.randrange(COUNTER_SHARDS)
+    rows = [{"name": name, "shard": shard, "value": deltas[name]} for name in sorted(deltas)]
+    add_to_rows(session.connection(), StatCounter.__table__, rows, ("value",))
+
+
+def register_counter_hooks(session=db.session):
+    """Keep stat_counters in step with every ORM insert, delete and counted-attribute change."""
+    if event.contains(session, "after_flush", _apply_deltas):
+        return
+    event.listen(session, "after_flush", _apply_deltas)
+
+
+def read_counters(*names):
+    """Current values of the named counters (0 for a counter never written)."""
+    rows = db.session.query(StatCounter.name, _TOTAL).filter(StatCounter.name.in_(names)).group_by(StatCounter.name)
+    values = dict.fromkeys(names, 0)
+    values.update(dict(rows))
+    return values
+
+
+def read_counter(name):
+    return read_counters(name)[name]
+
+
+def compute_counters():
+    """Recompute every counter from the source tables."""
+    counters = Counter()
+
+    counters["users"] = db.session.query(func.count(User.id)).scalar()
+    for role, n in db.session.query(User.role, func.count(User.id)).group_by(User.role):
+        counters[f"users:role:{role}"] = n
+
+    counters["appointments"] = db.session.query(func.count(Appointment.id)).scalar()
+    for status, n in db.session.query(Appointment.status, func.count(Appointment.id)).group_by(Appointment.status):
+        counters[f"appointments:status:{status}"] = n
+    year = extract("year", Appointment.appointment_time)
+    month = extract("month", Appointment.appointment_time)
+    for y, m, n in db.session.query(year, month, func.count(Appointment.id)).group_by(year, month):
+        counters[f"appointments:month:{int(y):04d}-{int(m):02d}"] = n
+
+    counters["consultations"] = db.session.query(func.count(Consultation.id)).scalar()
+
+    status_counts = db.session.query(DoctorApplication.status, func.count(DoctorApplication.id)).group_by(
+        DoctorApplication.status
+    )
+    for status, n in status_counts:
+        if status:
+            counters[f"doctor_applications:status:{status}"] = n
+
+    counters["payments"] = db.session.query(func.count(Payment.id)).scalar()
+    payment_totals = db.session.query(Payment.status, func.count(Payment.id), func.sum(Payment.amount)).group_by(
+        Payment.status
+    )
+    for status, n, amount in payment_totals:
+        counters[f"payments:status:{status}"] = n
+        counters[f"payments:revenue_cents:{status}"] = round((amount or 0) * 100)
+
+    return counters
+
+
+def reconcile_counters():
+    """Rewrite stat_counters from scratch; returns {name: (stored, actual)} for counters that were off.
+
+    Run it after bulk loads or raw SQL that bypass the ORM hooks. The
+    counted tables are read and the counters rewritten, one shard each, in
+    one transaction.
+    """
+    actual = compute_counters()
+    stored = dict(db.session.query(StatCounter.name, _TOTAL).group_by(StatCounter.name))
+    drift = {
+        name: (stored.get(name, 0), actual.get(name, 0))
+        for name in set(stored) | set(actual)
+        if stored.get(name, 0) != actual.get(name, 0)
+    }
+
+    table = StatCounter.__table__
+    db.session.execute(table.delete())
+    rows = [{"name": name, "value": value} for name, value in sorted(actual.items()) if value]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+    return drift
+
+
+def dashboard_figures(now):
+    """Every admin dashboard figure, read from stat_counters in one statement."""
+    this_month = f"appointments:month:{month_key(now)}"
+    fixed = (
+        "users", "users:role:patient", "users:role:doctor", "appointments", "consultations",
+        "doctor_applications:status:pending", this_month,
+    )
+    rows = db.session.query(StatCounter.name, _TOTAL).filter(or_(
+        StatCounter.name.in_(fixed),
+        StatCounter.name.startswith("appointments:status:"),
+        StatCounter.name.startswith("payments:revenue_cents:"),
+    )).group_by(StatCounter.name)
+
+    counters = dict.fromkeys(fixed, 0)
+    by_status = Counter()
+    revenue_cents = 0
+    for name, value in rows:
+        if name.startswith("appointments:status:"):
+            # statuses are stored in mixed case ("Pending", "pending")
+            by_status[name.rsplit(":", 1)[1].lower()] += value
+        elif name.startswith("payments:revenue_cents:"):
+            if name.rsplit(":", 1)[1] in REVENUE_STATUSES:
+                revenue_cents += value
+        else:
+            counters[name] = value
+
+    return {
+        "total_users": counters["users"],
+        "total_patients": counters["users:role:patient"],
+        "total_doctors": counters["users:role:doctor"],
+        "total_appointments": counters["appointments"],
+        "total_consultations": counters["consultations"],
+        "pending_applications": counters["doctor_applications:status:pending"],
+        "appointments_this_month": counters[this_month],
+        "appointments_by_status": {status: n for status, n in sorted(by_status.items()) if n},
+        "revenue": revenue_cents / 100,
+    }
@@ -0,0 +1,105 @@
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models.admin import Admin
+from app.models.doctors import Doctor
+from app.models.patients import Patients
+from app.models.user import User
+from app.utils.cache import LRUCache
+from app.utils.replicas import primary_reads
+
+TOKEN_VERSION_CLAIM = "tv"
+
+# role -> claim carrying the id of the caller's profile row in that role
+PROFILE_CLAIMS = {
+    "doctor": "doctor_id",
+    "patient": "patient_id",
+    "admin": "admin_id",
+}
+
+# user id -> token_version, so verifying a token rarely touches the database
+token_versions = LRUCache(maxsize=10000, ttl=30)
+
+_PENDING_KEY = "token_version_users"
+_MISSING = -1
+
+
+def token_claims(user, role=None):
+    """Claims for an access token: role, the matching profile id and the token version."""
+    role = role or user.role
+    claims = {"role": role, TOKEN_VERSION_CLAIM: user.token_version or 0}
+    profile = {
+        "doctor": user.doctor_profile,
+        "patient": user.patient_profile,
+        "admin": user.admin_profile,
+    }.get(role)
+    if profile is not None:
+        claims[PROFILE_CLAIMS[role]] = profile.id
+    return claims
+
+
+def issue_access_token(user, role=None):
+    return create_access_token(identity=str(user.id), additional_claims=token_claims(user, role))
+
+
+def current_token_version(user_id):
+    version = token_versions.get(user_id)
+    if version is None:
+        with primary_reads():
+            version = db.session.query(User.token_version).filter_by(id=user_id).scalar()
+        version = _MISSING if version is None else version
+        token_versions.set(user_id, version, ttl=current_app.config.get("TOKEN_VERSION_CACHE_TTL", 30))
+    return version
+
+
+def _bump(user, bumped):
+    if user is not None and user.id not in bumped:
+        user.token_version = (user.token_version or 0) + 1
+        bumped.add(user.id)
+
+
+def _bump_changed_users(session, flush_context, instances):
+    """Bump token_version when a change would make a user's token claims wrong.
+
+    That is a role change, or a doctor/patient/admin profile being created
+    or removed (the profile id claim). Runs before the flush so the new
+    version is written with the rest of the changes.
+    """
+    bumped = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes():
+            _bump(obj, bumped)
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Doctor, Patients, Admin)) and obj.user_id is not None:
+            _bump(obj.user or session.get(User, obj.user_id), bumped)
+
+
+def _evict(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        if user_id is not None:
+            token_versions.delete(user_id)
+
+
+def _discard(session, previous_transaction=None):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_token_checks(jwt, session=db.session):
+    """Reject access tokens whose version claim is older than the user's token_version."""
+
+    @jwt.token_verification_loader
+    def token_version_is_current(jwt_header, jwt_data):
+        if jwt_data.get("type") != "access":
+            return True
+        return jwt_data.get(TOKEN_VERSION_CLAIM, 0) == current_token_version(int(jwt_data["sub"]))
+
+    @jwt.token_verification_failed_loader
+    def stale_token(jwt_header, jwt_data):
+        return jsonify({"msg": "Token is no longer valid, please log in again"}), 401
+
+    if not event.contains(session, "before_flush", _bump_changed_users):
+        event.listen(session, "before_flush", _bump_changed_users)
+        event.listen(session, "after_commit", _evict)
+        event.listen(session, "after_rollback", _discard)
@@ -0,0 +1,36 @@
+"""unique active appointment per doctor slot
+
+Revision ID: 3f7c2a91d4b6
+Revises: 8abb0b1db29d
+Create Date: 2026-10-18 10:12:41.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7c2a91d4b6'
+down_revision = '8abb0b1db29d'
+branch_labels = None
+depends_on = None
+
+ACTIVE_SLOT_CONDITION = "status NOT IN ('Cancelled', 'cancelled', 'Rejected', 'rejected')"
+
+
+def upgrade():
+    # Existing double bookings must be resolved (cancelled) before this runs,
+    # otherwise the unique index cannot be built.
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_appointments_doctor_active_slot',
+            ['doctor_id', 'appointment_time'],
+            unique=True,
+            postgresql_where=sa.text(ACTIVE_SLOT_CONDITION),
+            sqlite_where=sa.text(ACTIVE_SLOT_CONDITION),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index('uq_appointments_doctor_active_slot')
@@ -0,0 +1,64 @@
+"""shard stat_counters
+
+Revision ID: 4e1f9b7c2d80
+Revises: 97dba5e4afc6
+Create Date: 2026-10-18 21:12:05.418226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e1f9b7c2d80'
+down_revision = '97dba5e4afc6'
+branch_labels = None
+depends_on = None
+
+
+def _stat_counters(*primary_key):
+    columns = [
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+    ]
+    if 'shard' in primary_key:
+        columns.append(sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    return sa.Table(
+        'stat_counters', sa.MetaData(), *columns,
+        sa.PrimaryKeyConstraint(*primary_key, name='stat_counters_pkey'),
+    )
+
+
+def _replace_primary_key(*columns):
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint('stat_counters_pkey', 'stat_counters', type_='primary')
+        op.create_primary_key('stat_counters_pkey', 'stat_counters', list(columns))
+        return
+    # SQLite cannot alter a primary key, so the table is copied with the new one
+    with op.batch_alter_table('stat_counters', copy_from=_stat_counters(*columns), recreate='always'):
+        pass
+
+
+def upgrade():
+    # existing totals stay in shard 0
+    op.add_column('stat_counters', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    _replace_primary_key('name', 'shard')
+
+
+def downgrade():
+    # fold every shard back into one row per counter first
+    op.execute(
+        "UPDATE stat_counters SET value = "
+        "(SELECT SUM(s.value) FROM stat_counters s WHERE s.name = stat_counters.name) "
+        "WHERE shard = 0"
+    )
+    op.execute(
+        "INSERT INTO stat_counters (name, shard, value) "
+        "SELECT name, 0, SUM(value) FROM stat_counters GROUP BY name "
+        "HAVING MIN(shard) > 0"
+    )
+    op.execute("DELETE FROM stat_counters WHERE shard <> 0")
+    # on SQLite the copy leaves the shard column behind
+    _replace_primary_key('name')
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_column('stat_counters', 'shard')
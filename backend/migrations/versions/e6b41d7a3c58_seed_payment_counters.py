@@ -0,0 +1,36 @@
+"""seed payment counters
+
+Revision ID: e6b41d7a3c58
+Revises: a83f0c6d2e19
+Create Date: 2026-10-18 16:40:12.384519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b41d7a3c58'
+down_revision = 'a83f0c6d2e19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "INSERT INTO stat_counters (name, value) "
+        "SELECT 'payments', COUNT(*) FROM payments"
+    )
+    op.execute(
+        "INSERT INTO stat_counters (name, value) "
+        "SELECT 'payments:status:' || status, COUNT(*) FROM payments GROUP BY status"
+    )
+    op.execute(
+        "INSERT INTO stat_counters (name, value) "
+        "SELECT 'payments:revenue_cents:' || status, CAST(ROUND(COALESCE(SUM(amount), 0) * 100) AS BIGINT) "
+        "FROM payments GROUP BY status"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM stat_counters WHERE name LIKE 'payments%'")
@@ -0,0 +1,100 @@
+"""Per-request authorization overhead: old role_required vs the current one.
+
+Runs a no-op view wrapped in ``@jwt_required()`` + ``@role_required([...])``
+inside a request context carrying a real access token, so the numbers are
+the cost of token decoding and the role check alone (no routing, no SQL).
+The old decorator verified the JWT a second time; the current one reuses
+the claims ``@jwt_required()`` already decoded.
+
+    python scripts/bench_auth.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from functools import wraps
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt, jwt_required, verify_jwt_in_request
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.utils.permissions import role_required
+from app.utils.tokens import issue_access_token
+
+
+def legacy_role_required(allowed_roles):
+    """role_required as it was: verifies the token again and substring-matches a string role."""
+    def wrapper(fn):
+        @wraps(fn)
+        def decorated(*args, **kwargs):
+            if request.method == "OPTIONS":
+                return '', 200
+            verify_jwt_in_request()
+            claims = get_jwt()
+            user_roles = claims.get("role", None)
+            if not user_roles:
+                return jsonify({"error": "Role not found in token"}), 401
+            if user_roles not in allowed_roles:
+                return jsonify({"error": "You do not have permission to access this resource"}), 403
+            return fn(*args, **kwargs)
+        return decorated
+    return wrapper
+
+
+def view():
+    return "ok"
+
+
+def run(app, token, decorator, iterations):
+    protected = jwt_required()(decorator(["admin", "doctor"])(view))
+    headers = {"Authorization": f"Bearer {token}"}
+    with app.test_request_context("/", headers=headers):
+        assert protected() == "ok"
+    started = time.perf_counter()
+    for _ in range(iterations):
+        # a fresh request context per call, as in a real request
+        with app.test_request_context("/", headers=headers):
+            protected()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def baseline(app, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with app.test_request_context("/"):
+            view()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        admin = User(name="Admin", email="admin@example.com", password="x", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        token = issue_access_token(admin)
+
+    context = baseline(app, args.iterations)
+    legacy = run(app, token, legacy_role_required, args.iterations)
+    current = run(app, token, role_required, args.iterations)
+    print(f"request context only          {context:8.1f} us")
+    print(f"jwt_required + old decorator  {legacy:8.1f} us  (auth {legacy - context:6.1f} us)")
+    print(f"jwt_required + role_required  {current:8.1f} us  (auth {current - context:6.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Concurrent booking benchmark.
+
+Fires N concurrent POST /api/appointments/book requests from N patients,
+first all at the SAME slot and then each at a DIFFERENT slot, reports
+throughput and checks that no slot ended up double booked.
+
+    python scripts/bench_booking.py --threads 32
+    DATABASE_URL=postgresql://... python scripts/bench_booking.py --threads 64
+
+Without DATABASE_URL a throwaway SQLite file is used.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, time as dtime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+
+def setup(app, patients):
+    from app.utils.tokens import issue_access_token
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.doctors import Doctor
+    from app.models.specialities import Speciality
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        speciality = Speciality(name="Bench")
+        doctor_user = User(name="Bench Doctor", email="bench-doctor@example.com", password="x", role="doctor")
+        db.session.add_all([speciality, doctor_user])
+        db.session.flush()
+        doctor = Doctor(user_id=doctor_user.id, speciality_id=speciality.id, experience_years=1, status="active")
+        users = [
+            User(name=f"Patient {i}", email=f"bench-patient-{i}@example.com", password="x", role="patient")
+            for i in range(patients)
+        ]
+        db.session.add(doctor)
+        db.session.add_all(users)
+        db.session.commit()
+        tokens = [
+            issue_access_token(u)
+            for u in users
+        ]
+        return doctor.id, tokens
+
+
+def fire(app, doctor_id, tokens, slots):
+    """Book slots[i] with tokens[i] concurrently; return (elapsed, status counts)."""
+    statuses = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(tokens))
+
+    def worker(token, slot):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post(
+            "/api/appointments/book",
+            json={"doctor_id": doctor_id, "date": slot.strftime("%Y-%m-%d"),
+                  "slot": slot.strftime("%H:%M"), "reason": "benchmark"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        with lock:
+            statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=worker, args=(t, s)) for t, s in zip(tokens, slots)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, statuses
+
+
+def duplicates(app):
+    from app.extensions import db
+    from app.models.appointments import Appointment, RELEASED_STATUSES
+
+    with app.app_context():
+        return db.session.query(Appointment.doctor_id, Appointment.appointment_time).filter(
+            Appointment.status.notin_(RELEASED_STATUSES)
+        ).group_by(Appointment.doctor_id, Appointment.appointment_time).having(db.func.count() > 1).count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+
+    base = datetime.combine(datetime.utcnow().date() + timedelta(days=7), dtime(8, 0))
+    scenarios = [
+        ("same slot", lambda n: [base] * n),
+        ("different slots", lambda n: [base + timedelta(minutes=30 * i) for i in range(n)]),
+    ]
+    for name, make_slots in scenarios:
+        doctor_id, tokens = setup(app, args.threads)
+        elapsed, statuses = fire(app, doctor_id, tokens, make_slots(args.threads))
+        dupes = duplicates(app)
+        print(f"{name:>16}: {args.threads} requests in {elapsed:.3f}s "
+              f"({args.threads / elapsed:.1f} req/s) statuses={dict(sorted(statuses.items()))} "
+              f"duplicate slots={dupes}")
+        if dupes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
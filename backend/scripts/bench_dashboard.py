@@ -0,0 +1,169 @@
+"""Admin dashboard benchmark: one /api/admin/dashboard call vs the endpoint fan-out.
+
+Seeds users, appointments, consultations, applications and payments,
+reconciles stat_counters, then times a dashboard load both ways through
+the test client (JWT verification, routing and SQL included) and counts
+the SQL statements each load runs. For reference it also times the
+COUNT(*) queries the count endpoints used to run against the base tables.
+
+    python scripts/bench_dashboard.py --appointments 200000
+    DATABASE_URL=postgresql://.../gynocare_bench python scripts/bench_dashboard.py
+
+Without DATABASE_URL a throwaway SQLite file is used. The target database is
+dropped and recreated, so never point this at real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from sqlalchemy import event, func
+
+from app import create_app
+from app.extensions import db
+from app.models.appointments import Appointment
+from app.models.consultation import Consultation
+from app.models.doctors import Doctor
+from app.models.doctorsapplications import DoctorApplication
+from app.models.payments import Payment
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.stat_counters import reconcile_counters
+from app.utils.tokens import issue_access_token
+
+FAN_OUT = [
+    "/api/admin/stats",
+    "/api/admin/patients/total",
+    "/api/admin/doctors/total",
+    "/api/admin/doctors/applications/pending",
+    "/api/admin/appointments/this_month",
+]
+DASHBOARD = ["/api/admin/dashboard"]
+
+
+def seed(users, appointments):
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(12)
+    doctors = max(users // 50, 1)
+
+    db.session.execute(Speciality.__table__.insert(), [{"id": i + 1, "name": f"Speciality {i}"} for i in range(10)])
+    db.session.execute(User.__table__.insert(), [
+        {"id": i + 1, "name": f"User {i}", "email": f"user{i}@example.com", "password": "x",
+         "role": "admin" if i == 0 else "doctor" if i <= doctors else "patient"}
+        for i in range(users)
+    ])
+    db.session.execute(Doctor.__table__.insert(), [
+        {"id": i, "user_id": i + 1, "speciality_id": i % 10 + 1, "experience_years": 5, "status": "active"}
+        for i in range(1, doctors + 1)
+    ])
+    db.session.execute(DoctorApplication.__table__.insert(), [
+        {"full_name": f"Applicant {i}", "email": f"applicant{i}@example.com", "phone": "0",
+         "years_of_experience": 1, "speciality_id": i % 10 + 1,
+         "status": "pending" if i % 10 == 0 else "approved"}
+        for i in range(doctors * 2)
+    ])
+
+    start = datetime.now() - timedelta(days=365)
+    rows = [
+        {"id": i + 1, "patient_id": rng.randrange(doctors + 2, users + 1), "doctor_id": i % doctors + 1,
+         "appointment_time": start + timedelta(minutes=30 * (i // doctors)),
+         "status": rng.choice(["Pending", "Approved", "Cancelled", "completed", "paid"]),
+         "consultation_type": "virtual"}
+        for i in range(appointments)
+    ]
+    for n in range(0, len(rows), 10000):
+        db.session.execute(Appointment.__table__.insert(), rows[n:n + 10000])
+    db.session.execute(Consultation.__table__.insert(), [
+        {"appointment_id": a["id"], "doctor_id": a["doctor_id"] + 1, "patient_id": a["patient_id"],
+         "status": "completed", "start_time": a["appointment_time"]}
+        for a in rows[::4]
+    ])
+    db.session.execute(Payment.__table__.insert(), [
+        {"appointment_id": a["id"], "doctor_id": a["doctor_id"] + 1, "patient_id": a["patient_id"],
+         "amount": 1500.0, "payment_method": "card", "status": "paid"}
+        for a in rows[::3]
+    ])
+    db.session.commit()
+    # bulk inserts bypass the ORM hooks
+    reconcile_counters()
+    return issue_access_token(db.session.get(User, 1))
+
+
+def legacy_counts():
+    """The COUNT(*) queries the count endpoints used to run."""
+    now = datetime.now()
+    month_start = datetime(now.year, now.month, 1)
+    db.session.query(func.count(User.id)).scalar()
+    db.session.query(func.count(Appointment.id)).scalar()
+    db.session.query(func.count(Consultation.id)).scalar()
+    db.session.query(func.count(User.id)).filter(User.role == "patient").scalar()
+    db.session.query(func.count(User.id)).filter(User.role == "doctor").scalar()
+    db.session.query(func.count(DoctorApplication.id)).filter(DoctorApplication.status == "pending").scalar()
+    db.session.query(func.count(Appointment.id)).filter(Appointment.appointment_time >= month_start).scalar()
+    db.session.query(func.coalesce(func.sum(Payment.amount), 0)).filter(Payment.status == "paid").scalar()
+
+
+def load(client, headers, urls):
+    for url in urls:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, (url, response.status_code, response.get_data(as_text=True))
+
+
+def measure(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def count_statements(engine, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--appointments", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        admin_token = seed(args.users, args.appointments)
+        engine = db.engine
+        legacy_ms = measure(legacy_counts, max(args.repeat // 10, 1))
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    print(f"{args.users} users, {args.appointments} appointments\n")
+    print(f"{'dashboard load':<34} {'requests':>8} {'statements':>10} {'ms/load':>9}")
+    for label, urls in (("endpoint fan-out", FAN_OUT), ("/api/admin/dashboard", DASHBOARD)):
+        statements = count_statements(engine, lambda: load(client, headers, urls))
+        elapsed = measure(lambda: load(client, headers, urls), args.repeat)
+        print(f"{label:<34} {len(urls):>8} {statements:>10} {elapsed:>9.2f}")
+    print(f"{'COUNT(*) over base tables (SQL)':<34} {'-':>8} {8:>10} {legacy_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Concurrent login benchmark.
+
+Fires --logins POST /api/auth/login/patient requests from --threads
+threads while one more thread keeps calling GET /api/specialities/all,
+and reports login and specialities p50/p99. Runs once with the hashing
+pool sized to --workers and once with it as wide as the login threads
+(roughly what inline hashing on every request thread did).
+
+    python scripts/bench_login.py --threads 32 --logins 256
+    PASSWORD_HASH_METHOD=pbkdf2:sha256:600000 python scripts/bench_login.py
+
+Without DATABASE_URL a throwaway SQLite file is used.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+PASSWORD = "bench-password"
+
+
+def setup(app, patients):
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.specialities import Speciality
+    from app.utils.passwords import passwords
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        hashed = passwords.hash(PASSWORD)
+        db.session.add(Speciality(name="Bench"))
+        db.session.add_all([
+            User(name=f"Patient {i}", email=f"bench-patient-{i}@example.com", password=hashed, role="patient")
+            for i in range(patients)
+        ])
+        db.session.commit()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def fire(app, threads, logins, patients):
+    """Run the logins across threads; return (elapsed, login times, statuses, specialities times)."""
+    login_times, other_times = [], []
+    statuses = Counter()
+    lock = threading.Lock()
+    done = threading.Event()
+    barrier = threading.Barrier(threads + 1)
+
+    def login_worker(offset):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(offset, logins, threads):
+            start = time.perf_counter()
+            response = client.post("/api/auth/login/patient", json={
+                "email": f"bench-patient-{i % patients}@example.com", "password": PASSWORD,
+            })
+            elapsed = time.perf_counter() - start
+            with lock:
+                login_times.append(elapsed)
+                statuses[response.status_code] += 1
+
+    def other_worker():
+        client = app.test_client()
+        barrier.wait()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/api/specialities/all")
+            other_times.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    background = threading.Thread(target=other_worker)
+    background.start()
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    background.join()
+    return elapsed, login_times, statuses, other_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.utils.passwords import PasswordService
+    import app.utils.passwords as password_module
+    app = create_app()
+    app.config["PASSWORD_HASH_WAIT"] = 60
+    setup(app, args.threads)
+    print(f"method={app.config['PASSWORD_HASH_METHOD']} threads={args.threads} logins={args.logins}")
+
+    for name, workers in (("pool", args.workers), ("per thread", args.threads)):
+        app.config["PASSWORD_HASH_WORKERS"] = workers
+        # the routes look the service up through the module, so swap in a fresh pool
+        password_module.passwords = PasswordService()
+        for module in ("app.routes.auth_routes", "app.routes.admin_routes"):
+            sys.modules[module].passwords = password_module.passwords
+        elapsed, login_times, statuses, other_times = fire(app, args.threads, args.logins, args.threads)
+        print(f"{name:>10} ({workers} workers): {args.logins / elapsed:.1f} logins/s "
+              f"login p50={percentile(login_times, 50):.1f}ms p99={percentile(login_times, 99):.1f}ms "
+              f"specialities p50={percentile(other_times, 50):.1f}ms p99={percentile(other_times, 99):.1f}ms "
+              f"statuses={dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Appointment list serialization benchmark.
+
+Serializes --rows in-memory Appointment rows (each with its patient,
+doctor, doctor user and speciality) the way GET /api/appointments/all
+does, once with the previous hand-written to_dict() and Flask's default
+JSON provider and once with the column serializers and FastJSONProvider,
+and reports the best of --repeat runs for each.
+
+    python scripts/bench_serialization.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+
+def make_rows(count):
+    from app.models.appointments import Appointment
+    from app.models.doctors import Doctor
+    from app.models.specialities import Speciality
+    from app.models.user import User
+
+    speciality = Speciality(id=1, name="Obstetrics")
+    doctors = []
+    for i in range(50):
+        user = User(id=10_000 + i, name=f"Doctor {i}", email=f"doctor-{i}@example.com", role="doctor")
+        doctors.append(Doctor(
+            id=i + 1, user=user, speciality=speciality, status="active", experience_years=5,
+            currency="KES", consultation_fee=1500.0, location="Nairobi", phone="0700000000",
+            bio="Bio", medicalLicenceNumber=f"LIC-{i}", joined_at=datetime(2025, 1, 1, 9, 30),
+        ))
+    patients = [
+        User(id=i + 1, name=f"Patient {i}", email=f"patient-{i}@example.com", role="patient")
+        for i in range(500)
+    ]
+    start = datetime(2026, 1, 1, 8, 0)
+    rows = []
+    for i in range(count):
+        patient, doctor = patients[i % len(patients)], doctors[i % len(doctors)]
+        rows.append(Appointment(
+            id=i + 1, patient_id=patient.id, patient=patient, doctor_id=doctor.id, doctor=doctor,
+            reason="Checkup", appointment_time=start + timedelta(minutes=30 * i), status="Pending",
+            consultation_type="virtual", created_at=start + timedelta(seconds=i, microseconds=123),
+            updated_at=start + timedelta(seconds=i, microseconds=456),
+        ))
+    return rows
+
+
+def legacy_doctor_dict(doctor):
+    return {
+        "id": doctor.id,
+        "status": doctor.status,
+        "experience_years": doctor.experience_years,
+        "currency": doctor.currency,
+        "consultation_fee": doctor.consultation_fee,
+        "profile_picture": doctor.profile_picture,
+        "location": doctor.location or "location not set",
+        "phone": doctor.phone,
+        "joined_at": doctor.joined_at,
+        "bio": doctor.bio,
+        "medicalLicenceNumber": doctor.medicalLicenceNumber,
+        "user": {"id": doctor.user.id, "name": doctor.user.name, "email": doctor.user.email},
+        "speciality": {"id": doctor.speciality.id, "name": doctor.speciality.name},
+    }
+
+
+def legacy_appointment_dict(a):
+    return {
+        "id": a.id,
+        "patient_id": a.patient_id,
+        "patient": {"id": a.patient.id, "name": a.patient.name, "email": a.patient.email},
+        "doctor_id": a.doctor_id,
+        "doctor_user_id": a.doctor.user_id if a.doctor else None,
+        "reason": a.reason,
+        "appointment_time": a.appointment_time,
+        "status": a.status,
+        "doctor": legacy_doctor_dict(a.doctor) if a.doctor else None,
+        "consultation_type": a.consultation_type,
+        "created_at": a.created_at,
+        "updated_at": a.updated_at,
+    }
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app
+    from app.utils.serialization import FastJSONProvider
+
+    app = create_app()
+    default_provider, fast_provider = DefaultJSONProvider(app), FastJSONProvider(app)
+    rows = make_rows(args.rows)
+    print(f"{args.rows} appointments, best of {args.repeat}")
+
+    results = {}
+    for name, to_dict, provider in (
+        ("before", legacy_appointment_dict, default_provider),
+        ("after", lambda a: a.to_dict(), fast_provider),
+    ):
+        dicts_time = best_of(args.repeat, lambda: [to_dict(a) for a in rows])
+        dicts = [to_dict(a) for a in rows]
+        dumps_time = best_of(args.repeat, lambda: provider.dumps(dicts))
+        body = provider.dumps(dicts)
+        results[name] = dicts_time + dumps_time
+        print(f"{name:>7}: to_dict {dicts_time * 1000:7.1f}ms  dumps {dumps_time * 1000:7.1f}ms  "
+              f"total {results[name] * 1000:7.1f}ms  body {len(body) / 1024:.0f} KiB")
+    print(f"  saved: {(results['before'] - results['after']) * 1000:.1f}ms "
+          f"({(1 - results['after'] / results['before']) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Check that list endpoints cost a fixed number of SQL queries.
+
+Seeds an in-memory SQLite database with a small and then a larger number of
+rows, calls every list endpoint and fails if the number of statements
+executed grows with the row count (an N+1 lazy-load regression).
+
+    python scripts/check_query_counts.py
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.appointments import Appointment
+from app.models.doctors import Doctor
+from app.models.doctorsapplications import DoctorApplication
+from app.models.patients import Patients
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.directory_cache import directory_cache
+from app.utils.tokens import issue_access_token, token_versions
+from app.utils.revocation import revoked_tokens
+
+ENDPOINTS = [
+    ("admin", "/api/appointments/all"),
+    ("admin", "/api/admin/appointments"),
+    ("admin", "/api/admin/users/doctors"),
+    ("admin", "/api/admin/patients/all"),
+    ("admin", "/api/admin/doctors/applications"),
+    ("patient", "/api/appointments/mybookings"),
+    ("doctor", "/api/appointments/doctor"),
+    (None, "/api/doctors/all"),
+]
+
+
+def seed(rows):
+    db.drop_all()
+    db.create_all()
+    specialities = [Speciality(name=f"Speciality {i}") for i in range(3)]
+    admin = User(name="Admin", email="admin@example.com", password="x", role="admin")
+    patient = User(name="Patient", email="patient@example.com", password="x", role="patient")
+    db.session.add_all(specialities + [admin, patient])
+    db.session.flush()
+    db.session.add(Patients(user_id=patient.id))
+
+    doctors = []
+    for i in range(rows):
+        user = User(name=f"Doctor {i}", email=f"doctor{i}@example.com", password="x", role="doctor")
+        db.session.add(user)
+        db.session.flush()
+        doctor = Doctor(user_id=user.id, speciality_id=specialities[i % 3].id, experience_years=i)
+        db.session.add(doctor)
+        doctors.append(doctor)
+        db.session.add(DoctorApplication(
+            full_name=f"Applicant {i}", email=f"applicant{i}@example.com", phone="0",
+            years_of_experience=1, speciality_id=specialities[i % 3].id,
+        ))
+    db.session.flush()
+
+    start = datetime(2026, 1, 5, 9, 0)
+    for i, doctor in enumerate(doctors):
+        db.session.add(Appointment(
+            patient_id=patient.id, doctor_id=doctor.id, reason="check",
+            appointment_time=start + timedelta(minutes=30 * i),
+        ))
+    db.session.commit()
+
+    return {
+        "admin": issue_access_token(admin, "admin"),
+        "patient": issue_access_token(patient),
+        "doctor": issue_access_token(doctors[0].user),
+    }
+
+
+def count_queries(app, tokens):
+    counts = {}
+    client = app.test_client()
+    for role, url in ENDPOINTS:
+        statements = []
+        # start every request cold so the counts compare like with like
+        directory_cache.backend.clear()
+        token_versions.clear()
+        revoked_tokens.clear()
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            response = client.get(url, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert response.status_code == 200, (url, response.status_code, response.get_data(as_text=True))
+        counts[url] = len(statements)
+    return counts
+
+
+def main():
+    app = create_app()
+    results = []
+    for rows in (2, 50):
+        with app.app_context():
+            tokens = seed(rows)
+        results.append(count_queries(app, tokens))
+
+    failed = False
+    for _, url in ENDPOINTS:
+        small, large = results[0][url], results[1][url]
+        status = "ok" if small == large else "GROWS WITH ROWS"
+        failed |= small != large
+        print(f"{url:<40} {small:>3} -> {large:>3} queries  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Check read-replica routing against two SQLite files.
+
+Seeds a primary database, copies it to a "replica" that then stops
+receiving changes (so anything read from it is visibly stale), and checks:
+
+  * anonymous and other users' GETs are served by the replica;
+  * a patient who just booked reads the primary, both through the
+    recent-write cookie and, without cookies, through the per-process map;
+  * the window closes after REPLICA_READ_YOUR_WRITES_SECONDS;
+  * cache fills read the primary even when the request may use the replica,
+    including the token version and revoked-token lookups made while
+    verifying a GET request's token.
+
+    python scripts/check_replica_routing.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+_tmpdir = tempfile.mkdtemp(prefix="gynocare-replica-")
+PRIMARY = os.path.join(_tmpdir, "primary.db")
+REPLICA = os.path.join(_tmpdir, "replica.db")
+WINDOW = 1.0
+NEW_SPECIALITY_ID = 2  # added on the primary after the copy
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY}"
+os.environ["DATABASE_REPLICA_URL"] = f"sqlite:///{REPLICA}"
+os.environ["REPLICA_READ_YOUR_WRITES_SECONDS"] = str(WINDOW)
+
+from flask_jwt_extended import decode_token
+
+from app import create_app
+from app.extensions import db
+from app.models.doctoravailability import DoctorAvailability
+from app.models.doctors import Doctor
+from app.models.patients import Patients
+from app.models.revoked_token import RevokedToken
+from app.models.specialities import Speciality
+from app.models.user import User
+from app.utils.replicas import RECENT_WRITE_COOKIE
+from app.utils.revocation import revoked_tokens
+from app.utils.tokens import issue_access_token, token_versions
+
+
+def seed():
+    db.create_all()
+    speciality = Speciality(name="Obstetrics")
+    doctor_user = User(name="Doctor", email="doctor@example.com", password="x", role="doctor")
+    patients = [User(name=f"Patient {i}", email=f"patient{i}@example.com", password="x", role="patient")
+                for i in range(3)]
+    db.session.add_all([speciality, doctor_user] + patients)
+    db.session.flush()
+    doctor = Doctor(user_id=doctor_user.id, speciality_id=speciality.id, experience_years=3)
+    db.session.add_all([doctor] + [Patients(user_id=user.id) for user in patients])
+    db.session.flush()
+    day = date.today() + timedelta(days=7)
+    db.session.add(DoctorAvailability(
+        doctor_id=doctor.id, day_of_week=day.strftime("%A"), start_time=dtime(9), end_time=dtime(12),
+    ))
+    db.session.commit()
+    tokens = [issue_access_token(user) for user in patients]
+    # a second token for the second patient, revoked after the copy
+    return doctor.id, day, tokens + [issue_access_token(patients[1])]
+
+
+def copy_to_replica():
+    with sqlite3.connect(PRIMARY) as source, sqlite3.connect(REPLICA) as target:
+        source.backup(target)
+
+
+def sees_new_speciality(client, token=None):
+    # /api/specialities/<id> is not cached, so it reads whichever database the request uses
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return client.get(f"/api/specialities/{NEW_SPECIALITY_ID}", headers=headers).status_code == 200
+
+
+def cached_specialities(client):
+    return len(client.get("/api/specialities/all").get_json())
+
+
+def cached_booked_slots(client, doctor_id, day):
+    return client.get(f"/api/doctors/booked-slots/{doctor_id}?date={day.isoformat()}").get_json()
+
+
+def accepted(client, token):
+    return client.get("/api/appointments/mybookings", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def accepted_by_fresh_worker(client, token):
+    """accepted() in a worker whose token caches have not seen the token or its user yet."""
+    token_versions.clear()
+    revoked_tokens.clear()
+    return accepted(client, token)
+
+
+def bookings(client, token):
+    response = client.get("/api/appointments/mybookings", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(response.get_json())
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        doctor_id, day, (booker, other, stale, revoked) = seed()
+    copy_to_replica()
+
+    client = app.test_client()
+    response = client.post(
+        "/api/appointments/book",
+        json={"doctor_id": doctor_id, "date": day.isoformat(), "slot": "09:00", "reason": "check"},
+        headers={"Authorization": f"Bearer {booker}"},
+    )
+    assert response.status_code == 201, response.get_data(as_text=True)
+    with app.app_context():
+        speciality = Speciality(name="Gynaecology")
+        db.session.add(speciality)
+        db.session.commit()
+        assert speciality.id == NEW_SPECIALITY_ID
+        # invalidate two tokens on the primary only; the replica still accepts both
+        claims = decode_token(stale)
+        db.session.execute(
+            User.__table__.update().where(User.id == int(claims["sub"])).values(token_version=User.token_version + 1)
+        )
+        claims = decode_token(revoked)
+        db.session.add(RevokedToken(
+            jti=claims["jti"], user_id=int(claims["sub"]), expires_at=datetime.utcfromtimestamp(claims["exp"]),
+        ))
+        db.session.commit()
+
+    checks = [
+        ("writer with cookie reads primary", client.get_cookie(RECENT_WRITE_COOKIE) is not None
+         and bookings(client, booker) == 1),
+        ("writer without cookie reads primary", bookings(app.test_client(), booker) == 1),
+        ("writer sees primary-only rows", sees_new_speciality(client, booker)),
+        ("other user reads replica", not sees_new_speciality(app.test_client(), other)),
+        ("anonymous reads replica", not sees_new_speciality(app.test_client())),
+        ("directory cache fills from primary", cached_specialities(app.test_client()) == 2),
+        ("booked slots cache fills from primary",
+         cached_booked_slots(app.test_client(), doctor_id, day) == ["09:00"]),
+        ("token version read from primary", not accepted_by_fresh_worker(app.test_client(), stale)),
+        ("revoked tokens pulled from primary", not accepted_by_fresh_worker(app.test_client(), revoked)),
+    ]
+    time.sleep(WINDOW + 0.1)
+    checks.append(("writer reads replica after window", bookings(app.test_client(), booker) == 0))
+
+    for name, passed in checks:
+        print(f"{name:<40} {'ok' if passed else 'FAILED'}")
+    sys.exit(0 if all(passed for _, passed in checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Show the query plan of every hot route query against a seeded database.
+
+Creates the schema (with the model indexes), seeds it with enough rows for
+the planner to prefer indexes, then prints EXPLAIN output for the query
+shapes used by the route modules.
+
+    python scripts/explain_queries.py
+    DATABASE_URL=postgresql://.../gynocare_explain python scripts/explain_queries.py
+
+Without DATABASE_URL a throwaway SQLite file is used. The target database is
+dropped and recreated, so never point this at real data.
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "DATABASE_URL" not in os.environ:
+    _tmpdir = tempfile.mkdtemp(prefix="gynocare-explain-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'explain.db')}"
+
+from sqlalchemy import func, text
+
+from app import create_app
+from app.extensions import db
+from app.models.admin import Admin
+from app.models.appointments import Appointment, RELEASED_STATUSES
+from app.models.cache_version import CacheVersion
+from app.models.consultation import Consultation
+from app.models.doctoravailability import DoctorAvailability
+from app.models.doctors import Doctor
+from app.models.doctorsapplications import DoctorApplication
+from app.models.patients import Patients
+from app.models.payments import Payment
+from app.models.specialities import Speciality
+from app.models.stat_counter import StatCounter
+from app.models.user import User
+from app.utils.directory_cache import DOCTORS as DOCTORS_NAMESPACE, SPECIALITIES
+from app.utils.stat_counters import reconcile_counters
+
+DOCTORS = 200
+PATIENTS = 2000
+APPOINTMENTS = 20000
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(7)
+
+    specialities = [{"id": i + 1, "name": f"Speciality {i}"} for i in range(10)]
+    db.session.execute(Speciality.__table__.insert(), specialities)
+
+    users = [
+        {"id": i + 1, "name": f"User {i}", "email": f"user{i}@example.com", "password": "x",
+         "role": "doctor" if i < DOCTORS else "patient"}
+        for i in range(DOCTORS + PATIENTS)
+    ]
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Admin.__table__.insert(), [{"user_id": 1}])
+    db.session.execute(Doctor.__table__.insert(), [
+        {"id": i + 1, "user_id": i + 1, "speciality_id": i % 10 + 1, "experience_years": 5, "status": "active"}
+        for i in range(DOCTORS)
+    ])
+    db.session.execute(Patients.__table__.insert(), [
+        {"user_id": DOCTORS + i + 1, "status": "active"} for i in range(PATIENTS)
+    ])
+    db.session.execute(DoctorAvailability.__table__.insert(), [
+        {"doctor_id": d + 1, "day_of_week": day, "start_time": time(9), "end_time": time(17)}
+        for d in range(DOCTORS) for day in ("Monday", "Wednesday", "Friday")
+    ])
+    db.session.execute(DoctorApplication.__table__.insert(), [
+        {"full_name": f"Applicant {i}", "email": f"applicant{i}@example.com", "phone": "0",
+         "years_of_experience": 1, "speciality_id": i % 10 + 1,
+         "status": "pending" if i % 10 == 0 else "approved"}
+        for i in range(2000)
+    ])
+
+    start = datetime(2025, 1, 1, 8, 0)
+    appointments = []
+    for i in range(APPOINTMENTS):
+        appointments.append({
+            "id": i + 1,
+            "patient_id": DOCTORS + rng.randrange(PATIENTS) + 1,
+            "doctor_id": i % DOCTORS + 1,
+            "appointment_time": start + timedelta(minutes=30 * (i // DOCTORS)),
+            "status": rng.choice(["Pending", "Approved", "Cancelled", "completed"]),
+            "consultation_type": "virtual",
+        })
+    db.session.execute(Appointment.__table__.insert(), appointments)
+    db.session.execute(Consultation.__table__.insert(), [
+        {"appointment_id": a["id"], "doctor_id": a["doctor_id"], "patient_id": a["patient_id"],
+         "status": "completed", "start_time": a["appointment_time"]}
+        for a in appointments[::4]
+    ])
+    db.session.execute(Payment.__table__.insert(), [
+        {"appointment_id": a["id"], "doctor_id": a["doctor_id"], "patient_id": a["patient_id"],
+         "amount": 1500.0, "payment_method": "card", "status": "paid"}
+        for a in appointments[::3]
+    ])
+    db.session.execute(CacheVersion.__table__.insert(), [
+        {"name": DOCTORS_NAMESPACE, "version": 1}, {"name": SPECIALITIES, "version": 1},
+    ])
+    db.session.commit()
+    # the Core inserts above bypass the counter hooks
+    reconcile_counters()
+
+    # refresh planner statistics (both SQLite and PostgreSQL understand ANALYZE)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def route_queries():
+    """(route, query) pairs mirroring the filters used by the route modules."""
+    day_start = datetime(2025, 1, 20)
+    day_end = day_start + timedelta(days=1)
+    return [
+        ("GET /api/appointments/mybookings",
+         Appointment.query.filter_by(patient_id=DOCTORS + 5)),
+        ("GET /api/appointments/doctor",
+         Appointment.query.filter_by(doctor_id=7)),
+        ("GET /api/appointments/all (keyset page)",
+         Appointment.query.filter(Appointment.appointment_time < day_start)
+         .order_by(Appointment.appointment_time.desc(), Appointment.id.desc()).limit(51)),
+        ("GET /api/doctors/booked-slots, slot index range",
+         db.session.query(Appointment.appointment_time).filter(
+             Appointment.doctor_id == 7,
+             Appointment.appointment_time >= day_start,
+             Appointment.appointment_time < day_end,
+             Appointment.status.notin_(RELEASED_STATUSES))),
+        ("POST /api/appointments/book, uniqueness probe",
+         Appointment.query.filter(
+             Appointment.doctor_id == 7,
+             Appointment.appointment_time == day_start,
+             Appointment.status.notin_(RELEASED_STATUSES))),
+        ("GET /api/appointments/doctor/<id>/available_slots, availability",
+         DoctorAvailability.query.filter_by(doctor_id=7, day_of_week="Monday")),
+        ("GET /api/patient/profile",
+         Patients.query.filter_by(user_id=DOCTORS + 5)),
+        ("GET /api/admin/doctors/applications",
+         DoctorApplication.query.filter_by(status="pending").order_by(DoctorApplication.id).limit(51)),
+        ("GET /api/admin/patients/total, stat_counters read",
+         db.session.query(StatCounter.name, func.sum(StatCounter.value))
+         .filter(StatCounter.name.in_(["users:role:patient"])).group_by(StatCounter.name)),
+        ("GET /api/doctors/all and /api/specialities/all, cache version",
+         db.session.query(CacheVersion.version).filter_by(name=DOCTORS_NAMESPACE)),
+        ("GET /api/admin/consultations (keyset page)",
+         Consultation.query.order_by(Consultation.start_time.desc(), Consultation.id.desc()).limit(51)),
+        ("consultation by appointment",
+         Consultation.query.filter_by(appointment_id=42)),
+        ("payment by appointment",
+         Payment.query.filter_by(appointment_id=42)),
+    ]
+
+
+def explain(query):
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    rows = db.session.execute(text(prefix + sql)).fetchall()
+    if dialect.name == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        seed()
+        for route, query in route_queries():
+            plan = explain(query)
+            uses_index = any("INDEX" in line.upper() for line in plan)
+            print(f"{route}  [{'index' if uses_index else 'NO INDEX'}]")
+            for line in plan:
+                print(f"    {line}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState } from "react"
 import { Card, CardContent } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import { Search, CheckCircle, XCircle } from "lucide-react"
 import { ApplicationDetailsDialog } from "@/components/admin/application-details-dialog"
 import { fetchDoctorApplications } from "@/services/doctor.sevice"
+import { usePagedList } from "@/hooks/use-paged-list"
 import { approveDoctorApplication, rejectDoctorApplication } from "@/services/doctor.sevice"
 
 const mockApplications = [
@@ -58,31 +59,18 @@ const mockApplications = [
 ]
 
 export default function DoctorApplicationsPage() {
-  const [applications, setApplications] = useState<any[]>([])
-  const [loading, setLoading] = useState(true)
-  const [error, setError] = useState<string | null>(null)
+  const {
+    items: applications,
+    setItems: setApplications,
+    loading,
+    hasMore,
+    loadingMore,
+    loadMore,
+  } = usePagedList<any>(fetchDoctorApplications)
   const [searchTerm, setSearchTerm] = useState("")
   const [selectedApp, setSelectedApp] = useState<(typeof mockApplications)[0] | null>(null)
   const [dialogOpen, setDialogOpen] = useState(false)
 
-  // Fetch applications on component mount
-  useEffect(() => {
-    const loadApplications = async () => {
-      try {
-        setLoading(true);
-        const data = await fetchDoctorApplications();
-        setApplications(data);
-      } catch (err) {
-        console.error(err);
-        setError("Failed to load doctor applications");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadApplications();
-  }, []);
-
 
   const filteredApplications = applications.filter(
     (app) =>
@@ -192,6 +180,14 @@ export default function DoctorApplicationsPage() {
         )}
       </div>
 
+      {hasMore && (
+        <div className="mt-6 flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
+
       {selectedApp && <ApplicationDetailsDialog app={selectedApp} open={dialogOpen} onOpenChange={setDialogOpen} />}
     </div>
   )
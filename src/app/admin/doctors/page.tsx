@@ -1,7 +1,8 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState } from "react"
 import { fetchDoctors } from "@/services/doctor.sevice"
+import { usePagedList } from "@/hooks/use-paged-list"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -89,30 +90,17 @@ function mapBackendDoctor(doc: BackendDoctor): DoctorUI {
 }
 
 export default function DoctorsPage() {
-  const [doctors, setDoctors] = useState<DoctorUI[]>([])
-  const [loading, setLoading] = useState(true)
-  const [error, setError] = useState<string | null>(null)
+  const {
+    items: doctors,
+    setItems: setDoctors,
+    hasMore,
+    loadingMore,
+    loadMore,
+  } = usePagedList<BackendDoctor, DoctorUI>(fetchDoctors, mapBackendDoctor)
   const [searchTerm, setSearchTerm] = useState("")
   const [selectedDoctor, setSelectedDoctor] = useState<DoctorUI | null>(null);
   const [dialogOpen, setDialogOpen] = useState(false)
 
-  useEffect(() => {
-    const loadDoctors = async () => {
-      try {
-        setLoading(true);
-        const data: BackendDoctor[] = await fetchDoctors();
-        setDoctors(data.map(mapBackendDoctor));
-      } catch (err) {
-        console.error(err);
-        setError("Failed to load doctors");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadDoctors();
-  }, []);
-
 
   const filteredDoctors = doctors.filter(
     (doc) =>
@@ -236,6 +224,14 @@ export default function DoctorsPage() {
         </CardContent>
       </Card>
 
+      {hasMore && (
+        <div className="mt-6 flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
+
       {selectedDoctor && <DoctorDetailsDialog doctor={selectedDoctor} open={dialogOpen} onOpenChange={setDialogOpen} />}
     </div>
   )
@@ -1,7 +1,8 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState } from "react"
 import { fetchPatients } from "@/services/admin.service"
+import { usePagedList } from "@/hooks/use-paged-list"
 import { Card, CardContent } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -62,43 +63,21 @@ interface Patient {
 }
 
 
+const normalizePatient = (p: any): Patient => ({
+  id: p.id,
+  name: p.name,
+  email: p.email,
+  phone: p.phone,
+  age: p.age,
+  joinDate: p.joined_at,
+  status: "active", // for now backend does not provide status
+});
+
 export default function PatientsPage() {
-  const [patients, setPatients] = useState<Patient[]>([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
+  const { items: patients, hasMore, loadingMore, loadMore } = usePagedList(fetchPatients, normalizePatient);
   const [searchTerm, setSearchTerm] = useState("")
   const [filterStatus, setFilterStatus] = useState<"all" | "active" | "inactive">("all")
 
-  useEffect(() => {
-    const loadPatients = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-
-        const data = await fetchPatients();
-        
-        const normalized: Patient[] = data.map((p: any) => ({
-          id: p.id,
-          name: p.name,
-          email: p.email,
-          phone: p.phone,
-          age: p.age,
-          joinDate: p.joined_at,
-          status: "active", // for now backend does not provide status
-        }));
-
-        setPatients(normalized);
-      } catch (err) {
-        console.error(err);
-        setError("Failed to load patients");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadPatients();
-  }, []);
-
 
   const filteredPatients = patients.filter((patient) => {
     const matchesSearch =
@@ -223,6 +202,14 @@ export default function PatientsPage() {
         </CardContent>
       </Card>
 
+      {hasMore && (
+        <div className="mt-6 flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
+
       {filteredPatients.length === 0 && (
         <Card className="mt-6">
           <CardContent className="py-12 text-center">
@@ -1,7 +1,8 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState } from "react"
 import { fetchAppointments } from "@/services/appointment.services"
+import { usePagedList } from "@/hooks/use-paged-list"
 import { Card, CardContent } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -93,9 +94,13 @@ const formatAppointment = (apt: any): Appointment => {
 
 
 export function AppointmentsContent() {
-  const [appointments, setAppointments] = useState<Appointment[]>([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
+  const {
+    items: appointments,
+    setItems: setAppointments,
+    hasMore,
+    loadingMore,
+    loadMore,
+  } = usePagedList(fetchAppointments, formatAppointment);
   const [searchTerm, setSearchTerm] = useState("")
   const [filterStatus, setFilterStatus] = useState<"all" | "confirmed" | "pending" | "completed" | "cancelled">("all")
   const [selectedAppointment, setSelectedAppointment] = useState<(typeof mockAppointments)[0] | null>(null)
@@ -109,30 +114,6 @@ export function AppointmentsContent() {
     return matchesSearch && matchesFilter
   })
 
-  //fetch appointments from backend
-  useEffect(() => {
-    const loadAppointments = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-
-        const data = await fetchAppointments();
-
-        const normalized = data.map(formatAppointment);
-
-        setAppointments(normalized);
-      } catch (err) {
-        console.error(err);
-        setError("Failed to load appointments");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadAppointments();
-  }, []);
-
-
   const handleDelete = () => {
     if (selectedAppointment) {
       setAppointments(appointments.filter((apt) => apt.id !== selectedAppointment.id))
@@ -255,6 +236,14 @@ export function AppointmentsContent() {
         </CardContent>
       </Card>
 
+      {hasMore && (
+        <div className="mt-6 flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
+
       {filteredAppointments.length === 0 && (
         <Card className="mt-6">
           <CardContent className="py-12 text-center">
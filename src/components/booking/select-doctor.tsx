@@ -6,12 +6,13 @@ import { fetchDoctors } from "@/services/doctor.sevice"
 import type { RootState } from "@/lib/store"
 import { selectDoctor, setCurrentStep, type Doctor } from "@/lib/features/booking-slice"
 import React from "react"
-import { useEffect, useState, useMemo } from "react"
+import { useState, useMemo } from "react"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input";
 import { Card } from "@/components/ui/card"
 import Image from "next/image"
 import { mapDoctorToUI } from "@/lib/features/booking-slice"
+import { usePagedList } from "@/hooks/use-paged-list"
 
 // const doctors: Doctor[] = [
 //   {
@@ -80,30 +81,20 @@ export function SelectDoctor() {
     }
   };
 
-  const [doctors, setDoctors] = useState<Doctor[]>([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
+  const {
+    items: doctors,
+    loading,
+    error,
+    hasMore,
+    loadingMore,
+    loadMore,
+  } = usePagedList<any, Doctor>(fetchDoctors, mapDoctorToUI);
 
   // Search and filter states
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedSpecialty, setSelectedSpecialty] = useState<string>("all");
   const [selectedLocation, setSelectedLocation] = useState<string>("all");
 
-  useEffect(() => {
-    async function loadDoctors() {
-      try {
-        const data = await fetchDoctors();
-        const mappedDoctors = data.map(mapDoctorToUI);
-        setDoctors(mappedDoctors);
-      } catch (err) {
-        setError("Failed to fetch doctors");
-      } finally {
-        setLoading(false);
-      }
-    }
-    loadDoctors();
-  }, []);
-
   // Extract unique specialties and locations from doctors
   const specialties = useMemo(() => {
     const uniqueSpecialties = [...new Set(doctors.map(d => d.specialty))]
@@ -326,6 +317,14 @@ export function SelectDoctor() {
         </div>
       )}
 
+      {hasMore && (
+        <div className="flex justify-center mb-6">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more doctors"}
+          </Button>
+        </div>
+      )}
+
       {/* Continue Button */}
       <div className="flex justify-end">
         <Button
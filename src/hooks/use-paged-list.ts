@@ -0,0 +1,56 @@
+import * as React from 'react'
+
+import type { Page } from '@/services/api'
+
+// Loads the first page on mount and one more page per loadMore() call,
+// instead of walking the cursor to the end of the table up front.
+export function usePagedList<Raw, Item = Raw>(
+  fetchPage: (cursor: string | null) => Promise<Page<Raw>>,
+  normalize: (raw: Raw) => Item = (raw) => raw as unknown as Item
+) {
+  const [items, setItems] = React.useState<Item[]>([])
+  const [cursor, setCursor] = React.useState<string | null>(null)
+  const [hasMore, setHasMore] = React.useState(false)
+  const [loading, setLoading] = React.useState(true)
+  const [loadingMore, setLoadingMore] = React.useState(false)
+  const [error, setError] = React.useState<string | null>(null)
+
+  // kept in refs so inline callbacks do not refetch the first page on every render
+  const fetchRef = React.useRef(fetchPage)
+  const normalizeRef = React.useRef(normalize)
+  fetchRef.current = fetchPage
+  normalizeRef.current = normalize
+
+  const load = React.useCallback(async (from: string | null) => {
+    const page = await fetchRef.current(from)
+    setItems((current) => (from ? current : []).concat(page.items.map(normalizeRef.current)))
+    setCursor(page.next_cursor)
+    setHasMore(page.next_cursor !== null)
+  }, [])
+
+  React.useEffect(() => {
+    setLoading(true)
+    setError(null)
+    load(null)
+      .catch((err) => {
+        console.error(err)
+        setError('Failed to load')
+      })
+      .finally(() => setLoading(false))
+  }, [load])
+
+  const loadMore = React.useCallback(async () => {
+    if (!cursor || loadingMore) return
+    setLoadingMore(true)
+    try {
+      await load(cursor)
+    } catch (err) {
+      console.error(err)
+      setError('Failed to load more')
+    } finally {
+      setLoadingMore(false)
+    }
+  }, [cursor, load, loadingMore])
+
+  return { items, setItems, loading, loadingMore, error, hasMore, loadMore }
+}
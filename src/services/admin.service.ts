@@ -1,8 +1,7 @@
-import api from "./api";
+import api, { fetchPage } from "./api";
 
-export const fetchPatients = async () => {
-  const response = await api.get("/admin/patients/all");
-  return response.data;
+export const fetchPatients = async (cursor: string | null = null) => {
+  return fetchPage("/admin/patients/all", cursor);
 };
 
 export const getPatientById = async (patientId: number | string) => {
@@ -16,4 +16,21 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// List endpoints return { items, next_cursor }; fetch one page, pass next_cursor back for the next one.
+export const fetchPage = async <T = any>(
+  url: string,
+  cursor: string | null = null,
+  limit = 50
+): Promise<Page<T>> => {
+  const response = await api.get<Page<T>>(url, {
+    params: cursor ? { limit, cursor } : { limit },
+  });
+  return response.data;
+};
+
 export default api;
@@ -1,4 +1,4 @@
-import api from "./api";
+import api, { fetchPage } from "./api";
 
 type AppointmentData = any;
 type PaymentData = any;
@@ -27,9 +27,8 @@ export const payAppointment = async (paymentData: PaymentData) => {
   return response.data;
 };
 
-export const fetchAppointments = async () => {
-  const response = await api.get("/appointments/all");
-  return response.data;
+export const fetchAppointments = async (cursor: string | null = null) => {
+  return fetchPage("/appointments/all", cursor);
 };
 
 export const updateAppointmentStatus = async (
@@ -1,4 +1,4 @@
-import api from "./api";
+import api, { fetchPage } from "./api";
 
 type DoctorId = number | string;
 type DateString = string;
@@ -12,9 +12,8 @@ export interface DoctorApplicationPayload {
   gender?: string;
 }
 
-export const fetchDoctors = async () => {
-  const response = await api.get("/doctors/all");
-  return response.data;
+export const fetchDoctors = async (cursor: string | null = null) => {
+  return fetchPage("/doctors/all", cursor);
 };
 
 export const fetchDoctorById = async (doctorId: DoctorId) => {
@@ -35,6 +34,15 @@ export const fetchBookedSlots = async (
   return res.data;
 };
 
+export const fetchDoctorSlotRange = async (
+  doctorId: DoctorId,
+  from: DateString,
+  to: DateString
+) => {
+  const res = await api.get(`/doctors/slots/${doctorId}?from=${from}&to=${to}`);
+  return res.data;
+};
+
 export const makeDoctorApplication = async (
   applicationData: DoctorApplicationPayload
 ) => {
@@ -42,9 +50,8 @@ export const makeDoctorApplication = async (
   return response.data;
 };
 
-export const fetchDoctorApplications = async () => {
-  const response = await api.get("/admin/doctors/applications");
-  return response.data;
+export const fetchDoctorApplications = async (cursor: string | null = null) => {
+  return fetchPage("/admin/doctors/applications", cursor);
 };
 
 export const approveDoctorApplication = async (applicationId: number | string) => {